@@ -27,20 +27,11 @@ class FaceRegistrationProcessor(QThread):
             if self.current_person.face_name is None:
                 raise Exception("face name error")
 
-            for ndarray in self.ndarray_images:
-                image = ndarray
-                
-                if self._is_canceled:
-                    break
-                
-                if self.face_setting_processor.add_person_encoding_by_name(self.current_person.face_name, image):
-                    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                    height, width, channel = image.shape
-                    bytes_per_line = 3 * width
-                    q_image = QImage(image.data, width, height, bytes_per_line, QImage.Format_RGB888)
-                    self.addItem.emit(q_image)
-                
-            self.finished.emit(0)
+            # 특징 추출은 병렬로, 저장은 묶어서 한 번에 한다
+            _, failed = self.face_setting_processor.add_person_encodings_by_name(
+                self.current_person.face_name, self.ndarray_images, self.emit_progress, lambda: self._is_canceled)
+
+            self.finished.emit(1 if failed else 0)
             
         except ValueError as e:
             if e == "face name error":
@@ -48,6 +39,16 @@ class FaceRegistrationProcessor(QThread):
         except Exception:
             self.finished.emit(1)
 
+    def emit_progress(self, count, image, registered):
+        """이미지 하나가 처리될 때마다 진행 상황과 등록된 이미지를 알린다."""
+        self.countChanged.emit(count)
+        if registered:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            height, width, channel = image.shape
+            bytes_per_line = 3 * width
+            q_image = QImage(image.data, width, height, bytes_per_line, QImage.Format_RGB888)
+            self.addItem.emit(q_image.copy())
+
     def cancel(self):
         """Cancel the registration process."""
         self._is_canceled = True
@@ -22,6 +22,10 @@ class PersonFaceSettingController:
         """face_name과 file_path를 전달하면 face_name과 일치하는 객체에 배열을 추가"""
         return self.face_manager.add_person_encoding_by_name(face_name, image)
 
+    def add_person_encodings_by_name(self, face_name: str, images: list, progress=None, is_canceled=None):
+        """face_name과 일치하는 객체에 여러 image를 한 번에 등록한다. (등록된 수, 실패한 수)를 반환"""
+        return self.face_manager.add_person_encodings_by_name(face_name, images, progress, is_canceled)
+
     def add_person_encoding_by_id(self, face_id: int, image):
         """face_name과 file_path를 전달하면 face_name과 일치하는 객체에 배열을 추가"""
         return self.face_manager.add_person_encoding_by_id(face_id, image)
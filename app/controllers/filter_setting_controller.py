@@ -68,6 +68,14 @@ class FilterSettingController:
         """필터 프리셋의 predict_conf를 반환한다."""
         return self.filter_manager.get_predict_conf_in_filter(filter_name)
 
+    def get_face_quality_in_filter(self, filter_name: str):
+        """필터 프리셋의 얼굴 품질 검사 기준을 반환한다."""
+        return self.filter_manager.get_face_quality_in_filter(filter_name)
+
+    def get_tiling_in_filter(self, filter_name: str):
+        """필터 프리셋의 타일 탐지 설정을 반환한다."""
+        return self.filter_manager.get_tiling_in_filter(filter_name)
+
     def get_filters(self):
         """Filter """
         return self.filter_manager.get_filters()   
@@ -117,6 +125,14 @@ class FilterSettingController:
         """필터 프리셋의 predict_conf를 변경한다."""
         return self.filter_manager.update_predict_conf_in_filter(filter_name, predict_conf)
 
+    def update_face_quality_in_filter(self, filter_name: str, min_size: int = None, min_sharpness: float = None, min_conf: float = None, min_aspect: float = None):
+        """필터 프리셋의 얼굴 품질 검사 기준을 변경한다."""
+        return self.filter_manager.update_face_quality_in_filter(filter_name, min_size, min_sharpness, min_conf, min_aspect)
+
+    def update_tiling_in_filter(self, filter_name: str, tile_size: int, tile_overlap: float = None):
+        """필터 프리셋의 타일 탐지 설정을 변경한다."""
+        return self.filter_manager.update_tiling_in_filter(filter_name, tile_size, tile_overlap)
+
     def delete_filter(self, filter_name: str):
         """Filter 삭제 메서드"""
         if self.filter_manager.get_filter(filter_name):
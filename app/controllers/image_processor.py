@@ -24,6 +24,7 @@ class ImageProcessor():
             # 이미지 읽어오기
             image = cv2.imread(image_path)
 
+            self.filtering.begin_frame()  # 바뀐 필터는 프레임을 시작할 때 한 번에 적용
             boxesList = self.filtering.filtering(image, is_video=False)
             processed_image = self.filtering.square_blur(image, boxesList)
             
@@ -53,6 +54,7 @@ class ImageProcessor():
             # 이미지 처리 
             blur_ratio = 50
             processed_image = image
+            self.filtering.begin_frame()  # 바뀐 필터는 프레임을 시작할 때 한 번에 적용
             if self.filtering.current_filter_info is not None:
                 if self.filtering.current_filter_info.background_blur:
                     processed_image = self.filtering.background_blur(processed_image)
@@ -12,11 +12,13 @@ class RealStreamProcessor(QThread):
     webcam_start = Signal()
     frame_ready = Signal(QImage)
     screen_size = Signal(tuple)
+    detect_size = Signal(int)  # 처리 시간에 맞춰 조절된 탐지 해상도(imgsz)
+    encode_stats = Signal(dict)  # 1초 동안 탐지된 얼굴 수와 실제로 인코딩한 얼굴 수 (Filtering.report_encode_stats)
     
     def __init__(self):
         super().__init__()
         self.video_cap = None  # 웹캠 캡처 객체
-        self.filtering = Filtering()
+        self.filtering = Filtering(async_recognition=True, target_fps=30, motion_gate=True, roi_inference=True)
         self.filter_manager = FilterManager()
         self.path_manager = PathManager()
         self.capture = None
@@ -162,7 +164,9 @@ class RealStreamProcessor(QThread):
 
     def process_frame(self, frame):
         '''프레임 처리 메서드 - 얼굴 모자이크 및 객체 인식'''
+        start = time.time()
         processed_frame = frame
+        self.filtering.begin_frame()  # 바뀐 필터는 프레임을 시작할 때 한 번에 적용
         if self.filtering.current_filter_info is not None:
             if self.filtering.current_filter_info.background_blur:
                 processed_frame = self.filtering.background_blur(frame)
@@ -177,7 +181,13 @@ class RealStreamProcessor(QThread):
             else:
                 if boxesList[key] is not None:
                     processed_frame = self.filtering.face_sticker(processed_frame, boxesList[key], key)
-    
+
+        imgsz = self.filtering.report_frame_time(time.time() - start)
+        if imgsz is not None:
+            self.detect_size.emit(imgsz)
+        encode_stats = self.filtering.report_encode_stats()
+        if encode_stats is not None:
+            self.encode_stats.emit(encode_stats)
         return processed_frame
 
     def set_filter(self, filter):
@@ -84,6 +84,7 @@ class VideoProcessor(QThread):
     def process_frame(self, frame):
         '''프레임 처리 메서드 - 얼굴 모자이크 및 객체 인식'''
         processed_frame = frame
+        self.filtering.begin_frame()  # 바뀐 필터는 프레임을 시작할 때 한 번에 적용
         if self.filtering.current_filter_info is not None:
             if self.filtering.current_filter_info.background_blur:
                 processed_frame = self.filtering.background_blur(processed_frame)
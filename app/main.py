@@ -1,6 +1,7 @@
 import sys
 import os
 import platform
+import multiprocessing
 import warnings
 from PySide6.QtWidgets import QApplication, QMainWindow
 from PySide6.QtCore import QFile
@@ -9,6 +10,7 @@ from modules import *
 from widgets import *
 from views import *
 from utils import *
+from models import ModelManager
 os.environ["QT_FONT_DPI"] = "96" # FIX Problem for High DPI and Scale above 100%
 
 widgets = None
@@ -225,8 +227,10 @@ class MainWindow(QMainWindow):
 
 if __name__ == "__main__":
     #try:
+    multiprocessing.freeze_support()  # 얼굴 등록 프로세스 풀이 빌드된 exe에서도 동작하도록
     app = QApplication(sys.argv)
 
+    ModelManager().preload()  # 화면을 띄우는 동안 탐지 모델을 백그라운드에서 불러온다
     window = MainWindow()
     window.show()
 
@@ -3,36 +3,44 @@ import cv2
 import dlib
 import face_recognition
 import re
-import pickle
+import numpy as np
 import qimage2ndarray
+from .face_store import FaceEncodingStore
+from .face_index import face_distance_matrix
 
 #이미지에서 얼굴 특징을 추출하여 반환하는 함수
 def extract_face_features(image, boxList = None):
     """
     주어진 이미지 파일에서 얼굴 특징을 추출합니다.
+    얼굴이 여러 개이면 가장 큰 얼굴을 사용합니다.
     
     Args:
     - image: 이미지 np.array
+    - boxList: 이미 찾은 얼굴의 경계 상자 (x1, y1, x2, y2) 리스트 (ObjectDetect.face_detect의 결과).
+      None이거나 비어있으면 dlib으로 얼굴을 찾습니다.
     
     Returns:
     - 얼굴 특징을 나타내는 인코딩 값. 얼굴이 없는 경우 None을 반환합니다. 
     """
-    if boxList is None:
-        face_landmarks_list = face_recognition.face_landmarks(image)
-    else:
-        locations = []
-        for box in boxList:
-            location = [int(box[1]), int(box[2]), int(box[3]), int(box[0])]
-            locations.append(location)
-        face_landmarks_list = face_recognition.face_landmarks(image, locations)
-    if len(face_landmarks_list) > 1:
-        print("Too many faces in image")
-        return None
-    elif len(face_landmarks_list) > 0:
-        return face_recognition.face_encodings(image)[0]
+    if boxList:
+        box = largest_box(boxList)
+        location = (int(box[1]), int(box[2]), int(box[3]), int(box[0]))
     else:
+        locations = face_recognition.face_locations(image)
+        if len(locations) == 0:
+            print("Cannot found face in image")
+            return None
+        location = max(locations, key=lambda loc: (loc[2] - loc[0]) * (loc[1] - loc[3]))
+    # 찾은 얼굴 위치를 넘겨 얼굴 탐지를 다시 하지 않고 인코딩한다
+    encodings = face_recognition.face_encodings(image, [location])
+    if len(encodings) == 0:
         print("Cannot found face in image")
         return None
+    return encodings[0]
+
+def largest_box(boxList):
+    """(x1, y1, x2, y2) 박스 중 가장 넓은 박스를 반환한다."""
+    return max(boxList, key=lambda box: (box[2] - box[0]) * (box[3] - box[1]))
 
     
 # "name" + _ + i 로 되어있는 딕셔너리에서 이름만 추출하는 함수
@@ -91,26 +99,15 @@ def find_max_face_number(name, data_dict):
 # 사람별 얼굴 특징을 저장된 파일에서부터 불러오는 함수
 def load_known_faces(data_path):
     """
-    저장된 데이터 파일에서 사람별 얼굴 특징을 불러옵니다.
+    저장소에서 사람별 얼굴 특징을 불러옵니다.
     
     Args:
-    - data_path: 데이터 파일의 경로
+    - data_path: 얼굴 인코딩 저장소 경로 (FaceEncodingStore의 base_path)
     
     Returns:
     - 불러온 사람별 얼굴 특징을 나타내는 딕셔너리
     """
-    # 파일이 존재하는지 확인
-    if os.path.exists(data_path):
-        # 파일이 있으면 로드
-        with open(data_path, 'rb') as f:
-            loaded_data = pickle.load(f)
-    else:
-        # 파일이 없으면 빈 딕셔너리 생성
-        loaded_data = {}
-        # 생성된 빈 딕셔너리를 파일에 저장
-        with open(data_path, 'wb') as f:
-            pickle.dump(loaded_data, f)
-    return loaded_data
+    return FaceEncodingStore(data_path).to_dict()
 
 # frame 내의 얼굴 위치를 받아 encoding 값을 반환하는 함수
 def face_encoding(frame, top, right, bottom, left):
@@ -146,163 +143,186 @@ def face_encoding_box(frame, box):
     
     return encoding
 
+# 여러 얼굴을 한 장의 이미지에 모아 붙이는 함수
+def tile_face_crops(frame, boxes, face_size):
+    """
+    얼굴 영역을 잘라 긴 변이 face_size를 넘지 않도록 줄인 뒤 한 장의 이미지에 가로로 이어 붙입니다.
+    
+    Args:
+    - frame: 이미지 프레임
+    - boxes: 얼굴의 경계 상자 (x1, y1, x2, y2) 리스트
+    - face_size: 얼굴 영역의 긴 변 최대 크기
+    
+    Returns:
+    - 얼굴들을 이어 붙인 이미지와 그 안에서의 얼굴 위치 (top, right, bottom, left) 리스트
+    """
+    margin = face_size // 4  # landmark 예측을 위해 얼굴 주변을 함께 자른다
+    cell = face_size + 2 * margin
+    height, width = frame.shape[:2]
+    canvas = np.zeros((cell, cell * len(boxes), 3), dtype=frame.dtype)
+    locations = []
+    for i, box in enumerate(boxes):
+        x1, y1, x2, y2 = int(box[0]), int(box[1]), int(box[2]), int(box[3])
+        scale = min(1.0, face_size / max(x2 - x1, y2 - y1, 1))
+        pad = int(margin / scale)
+        cx1, cy1 = max(x1 - pad, 0), max(y1 - pad, 0)
+        cx2, cy2 = min(x2 + pad, width), min(y2 + pad, height)
+        crop = frame[cy1:cy2, cx1:cx2]
+        if scale < 1.0 and crop.size > 0:
+            crop = cv2.resize(crop, (max(1, int((cx2 - cx1) * scale)), max(1, int((cy2 - cy1) * scale))), interpolation=cv2.INTER_AREA)
+        crop = crop[:cell, :cell]
+        offset = i * cell
+        canvas[:crop.shape[0], offset:offset + crop.shape[1]] = crop
+
+        left = offset + int((x1 - cx1) * scale)
+        top = int((y1 - cy1) * scale)
+        right = min(left + int((x2 - x1) * scale), offset + cell)
+        bottom = min(top + int((y2 - y1) * scale), cell)
+        locations.append((top, right, bottom, left))
+    return canvas, locations
+
+def face_encodings_boxes(frame, boxes, face_size=None):
+    """
+    프레임의 모든 얼굴 위치를 한 번에 넘겨 인코딩 값을 반환합니다.
+    
+    Args:
+    - frame: 이미지 프레임
+    - boxes: 얼굴의 경계 상자 (x1, y1, x2, y2) 리스트
+    - face_size: 지정하면 얼굴을 잘라 긴 변이 face_size 이하가 되도록 줄여서 인코딩합니다.
+    
+    Returns:
+    - boxes와 같은 순서의 얼굴 인코딩 값 리스트
+    """
+    if len(boxes) == 0:
+        return []
+    if face_size is None:
+        image = frame
+        locations = [(int(box[1]), int(box[2]), int(box[3]), int(box[0])) for box in boxes]
+    else:
+        image, locations = tile_face_crops(frame, boxes, face_size)
+    return face_recognition.face_encodings(image, locations)
+
+# 인코딩할 가치가 있는 얼굴인지 판단하는 함수
+def face_sharpness(frame, box, size=64):
+    """
+    얼굴 영역의 선명도(Laplacian 분산)를 반환합니다. 크기에 따른 차이를 줄이기 위해 긴 변을 size로 맞춰 계산합니다.
+    
+    Args:
+    - frame: 이미지 프레임
+    - box: 얼굴의 경계 상자 (x1, y1, x2, y2)
+    
+    Returns:
+    - 선명도 값. 흔들리거나 초점이 맞지 않은 얼굴일수록 작습니다.
+    """
+    x1, y1, x2, y2 = max(int(box[0]), 0), max(int(box[1]), 0), int(box[2]), int(box[3])
+    crop = frame[y1:y2, x1:x2]
+    if crop.size == 0:
+        return 0.0
+    scale = size / max(crop.shape[:2])
+    crop = cv2.resize(crop, (max(1, int(crop.shape[1] * scale)), max(1, int(crop.shape[0] * scale))), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+def check_face_quality(frame, box, confidence, min_size=20, min_sharpness=20, min_conf=0.25, min_aspect=0.45):
+    """
+    얼굴을 인코딩할지 판단합니다. 계산이 싼 조건부터 검사합니다.
+    
+    Args:
+    - frame: 이미지 프레임
+    - box: 얼굴의 경계 상자 (x1, y1, x2, y2)
+    - confidence: YOLO 신뢰도
+    - min_size: 얼굴 박스 짧은 변의 최소 크기 (px)
+    - min_sharpness: 최소 선명도 (face_sharpness)
+    - min_conf: 최소 YOLO 신뢰도
+    - min_aspect: 최소 가로/세로 비율. 옆모습처럼 폭이 좁은 얼굴을 거른다
+    
+    Returns:
+    - 인코딩할 만한 얼굴이면 True
+    """
+    width, height = box[2] - box[0], box[3] - box[1]
+    if min(width, height) < min_size:
+        return False
+    if confidence < min_conf:
+        return False
+    if width / max(height, 1) < min_aspect:
+        return False
+    return face_sharpness(frame, box) >= min_sharpness
+
 # 사람 얼굴 사진을 등록하는 함수
-def register_person(person_name, image, known_faces_path = './models/known_faces.pickle'):
+def register_person(person_name, image, known_faces_path = './models/known_faces'):
     """
     사람의 사진을 등록하고 얼굴 특징을 저장합니다.
     
     Args:
     - person_name: 사람의 이름
     - q_img: QImage 데이터
-    - known_faces_path: 얼굴 특징을 저장하는 파일 경로
+    - known_faces_path: 얼굴 인코딩 저장소 경로
     
     Returns:
     - True: 얼굴 특징이 성공적으로 등록되었을 경우
     - False: 얼굴 특징이 등록되지 않았거나 이미지에서 얼굴을 찾지 못한 경우
     """
-
-    if os.path.exists(known_faces_path):
-        person_faces = load_known_faces(known_faces_path)
-    else:
-        person_faces = {}
-
     face_features = extract_face_features(image)
     if face_features is not None:
-        max_face_number = find_max_face_number(person_name, person_faces) + 1
-        face_code = person_name + "_" + str(max_face_number)
-        person_faces[face_code] = face_features           
-        
-        print("register FaceFilter :", face_code)
-        
-        with open(known_faces_path, 'wb') as f:
-            pickle.dump(person_faces, f)
-
+        register_person_encoding(person_name, face_features, known_faces_path)
         return True
 
     print("No faces found for :", person_name)
     return False
 
-
-# known_faces와 face_encoding 사이의 거리를 비교하여 인식하는 함수
-def recognize_face(known_faces, face_encoding, tolerance=0.3):
+def register_person_encoding(person_name, face_features, known_faces_path = './models/known_faces'):
     """
-    얼굴을 인식하여 인식된 사람과 일치하는지 확인합니다.
-    
-    Args:
-    - known_faces: 사람별 얼굴 특징을 저장한 딕셔너리
-    - face_encoding: 얼굴의 인코딩 값
-    - tolerance: 허용 거리
+    이미 추출한 얼굴 특징을 저장소 끝에 덧붙입니다.
     
     Returns:
-    - 인식된 사람의 이름과 허용 거리
+    - 등록된 face_number
     """
-    recognized_face = "unknown"
-    min_distance = float('inf')
-    tolerance_used = None
-
-    for name, encodings in known_faces.items():
-            distance = face_recognition.face_distance([encodings], face_encoding[0])
-            # print("==========distance==========")
-            # print(distance)
-            if distance < tolerance and distance < min_distance:
-                min_distance = distance
-                recognized_face = name
-                tolerance_used = distance
+    face_number = FaceEncodingStore(known_faces_path).append(person_name, [face_features])[0]
+    print("register FaceFilter :", person_name + "_" + str(face_number))
+    return face_number
 
-    # print(recognized_face, ":::::")
-    # print(tolerance_used)
+def register_person_encodings(person_name, face_features_list, known_faces_path = './models/known_faces'):
+    """
+    여러 얼굴 특징을 저장소 끝에 한 번에 덧붙입니다.
+    
+    Returns:
+    - 등록된 face_number 리스트 (face_features_list와 같은 순서)
+    """
+    if len(face_features_list) == 0:
+        return []
+    face_numbers = FaceEncodingStore(known_faces_path).append(person_name, face_features_list)
+    print("register FaceFilter :", person_name, "x", len(face_numbers))
+    return face_numbers
 
-    return recognized_face, tolerance_used
 
-def delete_person(person_name, known_faces_path='./models/known_faces.pickle'):
+def delete_person(person_name, known_faces_path='./models/known_faces'):
     """
-    주어진 known_faces_path에서 특정 person_name에 해당하는 모든 얼굴 데이터를 삭제하고, 변경된 데이터를 다시 pickle 파일로 저장합니다.
+    주어진 known_faces_path 저장소에서 특정 person_name에 해당하는 모든 얼굴 데이터를 삭제합니다.
     
     Args:
     - person_name: 삭제할 얼굴 데이터의 소유자 이름
-    - known_faces_path: 얼굴 데이터 파일의 경로 (기본값: './models/known_faces.pickle')
-    """
-    # 데이터 파일이 존재하는지 확인
-    if os.path.exists(known_faces_path):
-        # 데이터 파일 불러오기
-        known_faces = load_known_faces(known_faces_path)
-
-        # 해당 person_name에 해당하는 모든 얼굴 데이터 삭제
-        keys_to_delete = [key for key in known_faces.keys() if key.startswith(person_name)]
-        if keys_to_delete:
-            for key in keys_to_delete:
-                del known_faces[key]
-            print(f"All face data for '{person_name}' deleted successfully.")
-        else:
-            print(f"No face data found for '{person_name}'.")
-        
-        # 변경된 데이터를 다시 저장
-        with open(known_faces_path, 'wb') as f:
-            pickle.dump(known_faces, f)
-            print("Data saved successfully.")
+    - known_faces_path: 얼굴 인코딩 저장소 경로 (기본값: './models/known_faces')
+    """
+    if FaceEncodingStore(known_faces_path).delete(person_name):
+        print(f"All face data for '{person_name}' deleted successfully.")
     else:
-        print("Data file not found.")
+        print(f"No face data found for '{person_name}'.")
 
 
-def delete_face_code(face_code, known_faces_path = './models/known_faces.pickle'):
+def delete_face_code(face_code, known_faces_path = './models/known_faces'):
     """
-    특정 face_code를 삭제하고 데이터를 pickle로 다시 저장합니다.
+    특정 face_code를 저장소에서 삭제합니다.
     
     Args:
     - face_code: 삭제할 face_code
-    - data_path: 데이터 파일의 경로 
-    """
-
-    # 데이터 파일이 존재하는지 확인
-    if os.path.exists(known_faces_path):
-        # 데이터 파일 불러오기
-        known_faces = load_known_faces(known_faces_path)
-        
-        # 특정 face_code 삭제
-        if face_code in known_faces:
-            del known_faces[face_code]
-            print(f"Face code '{face_code}' deleted successfully.")
-        else:
-            print(f"Face code '{face_code}' not found.")
-        
-        # 수정된 데이터를 다시 저장
-        with open(known_faces_path, 'wb') as f:
-            pickle.dump(known_faces, f)
-            print("Data saved successfully.")
-    else:
-        print("Data file not found.")
-
-
-#제외할 얼굴 딕셔너리, 검색할 얼굴 인코딩값을 넣으면 아는 사람인지 아닌지 반환
-def is_known_person(people_list, face_encoding, known_faces_path = './models/known_faces.pickle'):
-    #등록된 사람 딕셔너리를 일단 파일에서 받아옴
-    known_faces = load_known_faces(known_faces_path) # 수정예정
-    #이후 그 안에서 필터링을 제외할 사람 데이터를 담은 딕셔너리를 생성
-    except_faces = {}
-    for person in people_list:
-        except_faces.update(find_person_data(person, known_faces))
-    #이름에 해당하는 이름_i : encoding 반환 / except_faces에 추가
-    person_name, tolerance = recognize_face(except_faces, face_encoding)
-
-    if person_name == "unknown":
-        return False
+    - data_path: 얼굴 인코딩 저장소 경로
+    """
+    face_id, face_number = face_code.rsplit("_", 1)
+    if FaceEncodingStore(known_faces_path).delete(face_id, face_number):
+        print(f"Face code '{face_code}' deleted successfully.")
     else:
-        return True
-    
-
-def identify_known_face(people_list, face_encoding, known_faces_path = './models/known_faces.pickle'):
-    known_faces = load_known_faces(known_faces_path) # 수정예정
-    except_faces = {}
-    for person in people_list:
-        except_faces.update(find_person_data(person, known_faces))
-    #이름에 해당하는 이름_i : encoding 반환 / except_faces에 추가
-    person_name, tolerance = recognize_face(except_faces, face_encoding)
+        print(f"Face code '{face_code}' not found.")
 
-    if person_name == "unknown":
-        return None
-    else:
-        return extract_name(person_name)
-    
 
 def set_known_faces():
     pass #return known_faces.pickle 내용 dict 들어갈 예정
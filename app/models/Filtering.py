@@ -3,7 +3,16 @@ from .FaceFilter import *
 from .sticker_manager import StickerManager
 from .face_manager import FaceManager
 from .filter_info import Filter
+from .filter_plan import FilterPlan
 from .path_manager import PathManager
+from .identity_cache import IdentityCache
+from .recognition_worker import RecognitionWorker
+from .keyframe_scheduler import KeyframeScheduler, grow_box
+from .resolution_controller import ResolutionController
+from .box_ops import not_duplicated, box_ioa, merge_boxes
+from .detections import Detections, NO_ID
+from .motion_gate import MotionGate
+import time
 import cv2
 import numpy as np
 import mediapipe as mp
@@ -20,20 +29,55 @@ class Filtering:
         filtering: 감지된 객체와 선택적으로 얼굴을 기반으로 이미지를 필터링합니다.
         blur: boxesList에 지정된 관심 영역에 블러를 적용합니다.
     """
-    def __init__(self):
+    def __init__(self, async_recognition=False, target_fps=None, motion_gate=False, roi_inference=False):
         """
         Filtering 클래스를 초기화합니다.
+
+        async_recognition이 True이면 얼굴 인식을 백그라운드 스레드에서 수행하고,
+        인식 결과가 나오기 전까지 얼굴은 블러 처리됩니다.
+        target_fps를 지정하면 report_frame_time으로 알려준 처리 시간에 맞춰 탐지 해상도를 조절합니다.
+        motion_gate가 True이면 영상에서 바뀐 곳이 없는 프레임은 탐지를 건너뛰고, 바뀐 영역만 탐지합니다.
+        roi_inference가 True이면 track이 있는 동안 track 주변 영역만 탐지하고, 전체 프레임은 full_scan_interval초마다 탐지합니다.
         """
         self.object = ObjectDetect()
         self.faceManager = FaceManager()
         self.stickerManager = StickerManager()
         self.pathManeger = PathManager()
         self.face_recog_frame = 0
-
-        self.current_filter_info = None
-        self.change_filter_info = None
+        self.face_encode_size = 150  # 얼굴 인코딩 시 얼굴 영역의 긴 변 최대 크기 (None이면 원본 크기)
+        self.identity_cache = IdentityCache()
+        self.recognition_worker = RecognitionWorker(self.face_encode_size) if async_recognition else None
+        # 마지막 프레임의 얼굴 수와 그중 캐시 재사용/품질 미달로 인코딩을 건너뛴 수, 실제 인코딩한 수
+        self.encode_stats = {"faces": 0, "cached": 0, "skipped": 0, "encoded": 0}
+        self.encode_stats_total = dict(self.encode_stats)
+        self.reported_encode_stats = dict(self.encode_stats)  # report_encode_stats가 마지막으로 알린 시점의 누적 통계
+        self.encode_report_interval = 1.0  # 인코딩 통계를 알리는 간격 (초)
+        self.encode_report_time = time.time()
+        # 영상에서는 keyframe에서만 탐지하고 사이 프레임은 tracker 예측 박스를 사용한다
+        self.keyframe = KeyframeScheduler()
+        self.last_track_ids = []  # 마지막 keyframe에서 탐지된 얼굴들의 track_id
+        self.last_embeds = None  # 마지막 keyframe에서 탐지된 얼굴들의 인코딩 (tracker가 외형 embedding을 받을 때만)
+        self.last_verdicts = []  # 마지막 keyframe에서 탐지된 얼굴들의 인식 판정. 얼굴 id, NO_ID(필터에 없는 얼굴), None(판정 없음)
+        self.last_objects = Detections()  # 마지막 keyframe에서 블러할 사용자 정의 객체
+        self.resolution = ResolutionController(target_fps) if target_fps else None
+        self.reported_imgsz = None  # report_frame_time이 마지막으로 알린 imgsz
+        self.motion_gate = MotionGate() if motion_gate else None
+        self.last_origins = Detections()  # 마지막으로 탐지한 프레임의 일반 모델 결과 (집중 영역 포함)
+        self.last_customs = Detections()  # 마지막으로 탐지한 프레임의 사용자 정의 모델 결과
+        self.last_results = None  # 마지막으로 탐지한 프레임의 filtering 결과
+        self.roi_inference = roi_inference
+        self.full_scan_interval = 0.5  # track 주변만 탐지하는 동안 새로 나타난 객체를 찾기 위한 전체 탐지 간격 (초)
+        self.last_full_scan = 0
+
+        self.plan = None  # 현재 프레임에 사용하는 필터 실행 계획 (FilterPlan)
+        self.next_plan = None  # 다음 프레임부터 사용할 실행 계획. 다른 스레드에서 바꿀 수 있다
+        self.face_gallery = None
         self.init_id = False
-        self.filter_change = False
+
+    @property
+    def current_filter_info(self):
+        """현재 실행 계획의 필터 정보 (필터가 없으면 None)"""
+        return self.plan.filter if self.plan is not None else None
 
     def face_capture(self, img):
         boxList = self.object.face_detect(img)
@@ -42,36 +86,134 @@ class Filtering:
         return img
 
 
-    def face_filter(self, img, results, conf = 10 ,mag_ratio = 1):
-        """return 값 results = {key:[[[box], confidence, label],]} 여기서 box는 x1, y1, w, h의 형식"""
-        known_face_ids = []
-        for name in self.current_filter_info.face_filter.keys():
-            known_face_ids.append(name)
-            results[name] = []
-
-        origins = self.object.origin_detect(img, conf ,mag_ratio)  # 수정: results는 [[box], confidence, label]의 리스트 여기서의 box는 xywh의 값이므로 변환 필요
-        for result in origins:  # 수정: isFace를 is_face로 변경                
-            box = [result[0][0], result[0][1], result[0][0]+result[0][2], result[0][1]+result[0][3]] # xywh를 xyxy형태로 변환
-            # cv2.rectangle(img, (box[0],box[1]), (box[2],box[3]), (0,255,0), 2)
-            # cv2.putText(img, "face"+str(result[1]), (box[0] + 5, box[1] - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,255,0), 2)
-            face_encode = face_encoding_box(img, box)
-            # cv2.rectangle(img, (box[0], box[1]), (box[2], box[3]), (0,255,0), 2)
-            is_known = identify_known_face(known_face_ids, face_encode, self.pathManeger.load_known_faces_path())
-            if is_known is not None: 
-                results[int(is_known)].append(result)
+    def face_filter(self, img, conf = 10 ,mag_ratio = 1, focus_area = None, use_cache = False, detections = None):
+        """얼굴을 탐지하고 인식한다. 반환값은 얼굴 탐지 결과(Detections)이며, 인식된 얼굴은 identity_ids에 얼굴 id가 들어있다. (나머지는 NO_ID, 블러)
+        use_cache가 True이면 track_id별로 캐시된 인식 결과를 재사용하고, 재검증이 필요한 얼굴만 인식한다.
+        tracker가 얼굴 인코딩을 외형 embedding으로 받으면 얼굴별 인코딩을 last_embeds에 남긴다.
+        tracker용으로 따로 인코딩하지 않고, track에 캐시된 인코딩과 이번 프레임에 인식하며 구한 인코딩만 사용한다. (없으면 None)
+        detections에 (원본 탐지 결과, 집중 영역 탐지 결과)를 넘기면 탐지를 다시 하지 않는다.
+        얼굴별 인식 판정은 last_verdicts에 남긴다. 품질 미달로 건너뛰었거나 비동기 인식을 기다리는 얼굴은 판정이 없다(None)."""
+        face_gallery = self.get_face_gallery()
+
+        if detections is None:
+            focus_img = self.get_area_img(img, focus_area) if focus_area is not None else None
+            origins = self.object.origin_detect(img, conf ,mag_ratio)
+            focus_origins = self.object.origin_detect(focus_img, conf, mag_ratio) if focus_img is not None else Detections()
+        else:
+            origins, focus_origins = detections
+        if focus_area is not None and len(focus_origins) > 0:
+            focus_origins = focus_origins.shifted(focus_area[0], focus_area[1])
+            # 전체 이미지에서 이미 찾은 얼굴과 겹치는 집중 영역 결과는 제외
+            keep = not_duplicated(focus_origins.boxes, origins.boxes)
+            origins = Detections.concat([origins, focus_origins[keep]])
+
+        self.last_origins = origins
+        boxes = origins.boxes.tolist()
+        if use_cache:
+            track_ids = self.object.match_track_ids(boxes)
+        else:
+            track_ids = [None] * len(boxes)
+        self.last_track_ids = track_ids
+
+        is_async = use_cache and self.recognition_worker is not None
+        if is_async:
+            for track_id, face_id, distance, box, face_encode in self.recognition_worker.collect(self.identity_cache.generation):
+                self.identity_cache.update(track_id, face_id, distance, box)
+                self.identity_cache.set_embedding(track_id, face_encode)  # 인식 스레드가 구한 인코딩을 tracker가 재사용한다
+
+        face_ids = [None] * len(boxes)
+        verify = []
+        undecided = set()  # 인식 판정이 없는 얼굴
+        for i, track_id in enumerate(track_ids):
+            entry = self.identity_cache.get(track_id)
+            if self.identity_cache.needs_verify(track_id, boxes[i]):
+                verify.append(i)
+                if is_async and entry is not None:
+                    face_ids[i] = entry["face_id"]  # 재검증이 끝날 때까지 이전 인식 결과 유지
+                elif is_async:
+                    undecided.add(i)
             else:
-                results[-1].append(result)
-        return results
+                face_ids[i] = entry["face_id"]
+
+        # 작거나 흐리거나 각도가 극단적인 얼굴은 인코딩하지 않고 블러 처리
+        cached = len(boxes) - len(verify)
+        verify, skipped = self.face_quality_gate(img, origins, boxes, verify)
+        for i in skipped:
+            face_ids[i] = None
+            undecided.add(i)
+
+        # tracker용 인코딩. 따로 인코딩하지 않고 track에 캐시된 인코딩을 넘긴다. (없는 얼굴은 tracker가 위치로만 짝짓는다)
+        embeds = None
+        if use_cache and self.object.tracker_needs_embeds():
+            embeds = [self.identity_cache.get_embedding(track_id) for track_id in track_ids]
+        self.update_encode_stats(len(boxes), cached, len(skipped), len(verify))
+
+        if is_async:
+            # 인코딩과 인식은 백그라운드에서 수행하고, 결과가 없는 얼굴은 블러 처리된다
+            self.recognition_worker.submit(img, [track_ids[i] for i in verify], [boxes[i] for i in verify],
+                                           face_gallery, self.identity_cache.generation)
+        else:
+            # 인식이 필요한 모든 얼굴(집중 영역 포함)을 한 번에 인코딩하고 갤러리와 한 번에 비교
+            face_encodes = face_encodings_boxes(img, [boxes[i] for i in verify], self.face_encode_size)
+            if embeds is not None:
+                for i, face_encode in zip(verify, face_encodes):
+                    embeds[i] = face_encode  # 인식용 인코딩을 tracker에도 넘긴다
+            for i, (face_id, distance) in zip(verify, face_gallery.match(face_encodes)):
+                face_ids[i] = face_id
+                self.identity_cache.update(track_ids[i], face_id, distance, boxes[i])
+        self.last_embeds = embeds
+
+        faces = origins.copy()
+        faces.track_ids[:] = [NO_ID if track_id is None else track_id for track_id in track_ids]
+        faces.identity_ids[:] = [face_id if face_id is not None and face_id in self.plan.face_ids else NO_ID for face_id in face_ids]
+        self.last_verdicts = [None if i in undecided else identity for i, identity in enumerate(faces.identity_ids.tolist())]
+        return faces
     
-    def object_filter(self, img, results):
-        """return 값 results = {key:[[box],],} 여기서 box는 xyxy의 형태"""
-        customs = self.object.custom_detect(img)
-        for result in customs:
-            if result[2] in self.current_filter_info.object_filter:
-                box = [result[0][0], result[0][1], result[0][0]+result[0][2], result[0][1]+result[0][3]] # xywh를 xyxy형태로 변환
-                results[-2].append(box)
+    def face_quality_gate(self, img, origins, boxes, indexes):
+        """
+        현재 필터의 품질 기준으로 인코딩할 얼굴을 고른다.
+
+        Returns:
+        - (기준을 통과한 얼굴 index 리스트, 통과하지 못한 얼굴 index 리스트)
+        """
+        info = self.current_filter_info
+        passed, skipped = [], []
+        for i in indexes:
+            if check_face_quality(img, boxes[i], origins.scores[i], info.face_min_size, info.face_min_sharpness,
+                                  info.face_min_conf / 100, info.face_min_aspect):
+                passed.append(i)
+            else:
+                skipped.append(i)
+        return passed, skipped
+
+    def update_encode_stats(self, faces, cached, skipped, encoded):
+        """프레임별/누적 인코딩 통계를 갱신한다."""
+        self.encode_stats = {"faces": faces, "cached": cached, "skipped": skipped, "encoded": encoded}
+        for key, value in self.encode_stats.items():
+            self.encode_stats_total[key] += value
+
+    def object_filter(self, img, faces, customs = None):
+        """필터에서 블러할 사용자 정의 객체 결과(Detections)를 반환한다.
+        customs에 사용자 정의 모델의 탐지 결과를 넘기면 탐지를 다시 하지 않는다."""
+        if customs is None:
+            customs = self.object.custom_detect(img)
+        customs = customs[customs.label_mask(self.plan.object_names)]
+        # 이미 블러 처리될 얼굴 박스 안에 들어가는 사용자 정의 모델 결과는 중복이므로 제외
+        return customs[not_duplicated(customs.boxes, faces.boxes[faces.identity_ids == NO_ID])]
+
+    def to_results(self, faces, customs):
+        """
+        filtering 결과 딕셔너리를 만든다. 박스는 x1, y1, x2, y2의 형식
+
+        Returns:
+        - {-2: 사용자 정의 객체 박스, -1: 블러할 얼굴 박스, 얼굴 id: 스티커를 붙일 얼굴 박스}
+        """
+        results = {-2: customs.boxes.tolist(), -1: []}
+        for face_id in self.plan.face_ids:
+            results[face_id] = []
+        for box, identity in zip(faces.boxes.tolist(), faces.identity_ids.tolist()):
+            results[identity if identity != NO_ID and identity in results else -1].append(box)
         return results
-    
 
     def background_blur(self, img):
         mp_selfie_segmentation = mp.solutions.selfie_segmentation
@@ -102,79 +244,148 @@ class Filtering:
         focus_img = np.ascontiguousarray(focus_img)
         return focus_img
     
-    def is_dup(self, new, results):
-        already = []
-        for box in results.values():
-            already.extend(box)
-        
-        for box in already:
-            if len(box) > 0:
-                x1, y1, x2, y2 = box[0][0], box[0][1], box[0][0]+box[0][2], box[0][1]+box[0][3]
-                nx1, ny1, nx2, ny2 = new[0][0], new[0][1], new[0][0]+new[0][2], new[0][1]+new[0][3]
-
-                
-                intersection_x1 = max(x1, nx1)
-                intersection_y1 = max(y1, ny1)
-                intersection_x2 = min(x2, nx2)
-                intersection_y2 = min(y2, ny2)
-
-                intersection_width = max(0, intersection_x2 - intersection_x1)
-                intersection_height = max(0, intersection_y2 - intersection_y1)
-                intersection_area = intersection_height * intersection_width
-                if intersection_area / (new[0][2]*new[0][3]) >= 0.7:
-                    print("box:",box[0])
-                    print("new:",new[0])
-                    return True
- 
-        return False
-
     def filtering(self, img, is_video=True, focus_area=None):
         results = dict()
         results[-2] = []
         results[-1] = []
 
-        if self.current_filter_info is None:
+        plan = self.plan
+        if plan is None:
             return results
                 
-        temp_ratio = self.current_filter_info.imgsz_mag * 3 / 100 + 0.01 # 임시로 UI사용하려고 만든 todo 0.01은 0 되지 말라고 넣어놨는데 if로 했다가 이게 더 나은거같음
-        conf = self.current_filter_info.predict_conf / 100
+        temp_ratio = plan.mag_ratio
+        conf = plan.conf
+        if self.resolution is not None:
+            temp_ratio = self.resolution.ratio(img.shape, temp_ratio)  # 필터 설정을 상한으로 처리 시간에 맞춘 배율
         #print(temp_ratio)
         
-        results = self.face_filter(img, results, conf, temp_ratio)
-        
-        if focus_area is not None:
-            focus_img = self.get_area_img(img, focus_area)
-            temp = {-2:[], -1:[]}
-            focus_result = self.face_filter(focus_img, temp, conf, temp_ratio)
-            for key, value in focus_result.items():
-                for box in value:
-                    if len(box) > 0:
-                        box[0][0] += focus_area[0]
-                        box[0][1] += focus_area[1]
-                        if not self.is_dup(box, results):
-                            results[key].append(box)
+        state = "full"
+        if is_video and self.motion_gate is not None:
+            if self.init_id is True:
+                self.motion_gate.reset()
+            state, regions = self.motion_gate.check(img)
+            if state == "static" and self.last_results is not None:
+                # 마지막 탐지 이후 바뀐 곳이 없으면 tracker를 진행시키지 않고 이전 결과를 그대로 사용
+                return copy_results(self.last_results)
+
+        if is_video:
+            self.identity_cache.next_frame()
+            if self.init_id is True:
+                self.keyframe.reset()
+                self.last_full_scan = 0
+            if not self.keyframe.next_frame():
+                return self.predicted_filtering(img)
+
+        accept = True
+        track_roi = False
+        if is_video and state == "full" and self.roi_inference and time.time() - self.last_full_scan < self.full_scan_interval:
+            # 전체 탐지 사이에는 track 주변 영역만 탐지한다
+            regions = self.object.track_rois(img.shape[1], img.shape[0])
+            if len(regions) > 0:
+                state = "regions"
+                track_roi = True
+                accept = False  # 영역 밖의 변화는 다음 전체 탐지에서 확인하도록 기준 프레임을 유지한다
+
+        if state == "regions":
+            origins, customs = self.detect_regions(img, conf, temp_ratio, regions, full_custom=track_roi)
+            focus_origins = Detections()
+        else:
+            # 두 YOLO 모델을 같은 프레임에 대해 동시에 실행
+            focus_img = self.get_area_img(img, focus_area) if focus_area is not None else None
+            origins, focus_origins, customs = self.object.detect_all(img, conf, temp_ratio, focus_img,
+                                                                     plan.tile_size, plan.tile_overlap)
+        if state == "full":
+            self.last_full_scan = time.time()
+        if self.motion_gate is not None and accept:
+            self.motion_gate.accept()  # 탐지한 프레임을 다음 비교의 기준으로 삼는다
+        self.last_customs = customs
+        faces = self.face_filter(img, conf, temp_ratio, focus_area, use_cache=is_video, detections=(origins, focus_origins))
         
         if is_video:
-            if len(results) != 0:
-                results = self.object.object_track(img, results)
+            # keyframe 탐지 결과가 track 예측과 다르면(새 얼굴, 사라진 얼굴) 탐지 간격을 줄인다
+            matched = set(track_id for track_id in self.last_track_ids if track_id is not None)
+            self.keyframe.update(None in self.last_track_ids or len(matched) < len(self.object.live_track_ids()))
+            faces = self.object.object_track(img, faces, self.last_embeds, self.last_verdicts)
+            if self.last_embeds is not None:
+                # 새로 만들어진 track을 포함해 track별 인코딩을 저장하여, 인식하지 않는 프레임에 재사용한다
+                for track_id, embed in zip(self.object.match_track_ids(self.last_origins.boxes.tolist()), self.last_embeds):
+                    self.identity_cache.set_embedding(track_id, embed)
+            self.identity_cache.evict(self.object.live_track_ids())
             if self.init_id is True:
                 self.object.init_exclude_id()
+                self.identity_cache.clear()
                 self.init_id = False
-        else:
-            for key, result in results.items():
-                boxes = []
-                for value in result:
-                    if len(value) != 0:
-                        box = [value[0][0], value[0][1], value[0][0]+value[0][2], value[0][1]+value[0][3]]
-                        boxes.append(box)
-                results[key] = boxes
 
-
-        results = self.object_filter(img, results)
-        results = self.filter_state_check(results)
+        objects = self.object_filter(img, faces, customs)
+        self.last_objects = objects
+        results = self.to_results(faces, objects)
+        if is_video:
+            self.last_results = copy_results(results)
 
         # print("results:",results)
         return results
+
+    def detect_regions(self, img, conf, mag_ratio, regions, full_custom=False):
+        """
+        바뀐 영역만 탐지하고, 바뀌지 않은 곳은 이전 탐지 결과를 사용한다.
+        full_custom이 True이면(track 주변 영역만 탐지하는 경우) 사용자 정의 모델은 전체 프레임을 탐지한다.
+        사용자 정의 객체는 얼굴 track 주변에 있다는 보장이 없기 때문이다.
+
+        Returns:
+        - (일반 모델 결과, 사용자 정의 모델 결과) Detections
+        """
+        previous = np.concatenate([self.last_origins.boxes, self.last_customs.boxes])
+        if len(previous) > 0:
+            # 바뀐 영역에 걸친 이전 결과는 잘리지 않도록 영역에 포함시켜 다시 탐지한다
+            touched = box_ioa(previous, regions).max(axis=1) > 0
+            regions = merge_boxes(regions + previous[touched].tolist())
+        origins, customs = self.object.detect_regions(img, regions, conf, mag_ratio, full_custom)
+
+        stale = box_ioa(self.last_origins.boxes, regions).max(axis=1) > 0
+        origins = Detections.concat([origins, self.last_origins[~stale]])
+        if not full_custom:
+            stale = box_ioa(self.last_customs.boxes, regions).max(axis=1) > 0
+            customs = Detections.concat([customs, self.last_customs[~stale]])
+        return origins, customs
+
+    def report_frame_time(self, frame_time):
+        """
+        프레임 처리 시간(초)을 알려 탐지 해상도를 조절한다.
+
+        Returns:
+        - 탐지 해상도(imgsz)가 바뀌었으면 새 imgsz, 아니면 None
+        """
+        if self.resolution is None:
+            return None
+        self.resolution.update(frame_time)
+        if self.resolution.imgsz == self.reported_imgsz:
+            return None
+        self.reported_imgsz = self.resolution.imgsz
+        return self.reported_imgsz
+
+    def report_encode_stats(self):
+        """
+        encode_report_interval초마다 그동안의 인코딩 통계를 반환한다.
+
+        Returns:
+        - 마지막으로 알린 뒤의 얼굴 수, 캐시 재사용 수, 품질 미달 수, 인코딩 수 딕셔너리. 알릴 때가 아니면 None
+        """
+        now = time.time()
+        if now - self.encode_report_time < self.encode_report_interval:
+            return None
+        stats = {key: value - self.reported_encode_stats[key] for key, value in self.encode_stats_total.items()}
+        self.reported_encode_stats = dict(self.encode_stats_total)
+        self.encode_report_time = now
+        return stats
+
+    def predicted_filtering(self, img):
+        """keyframe 사이의 프레임에서 탐지 없이 tracker 예측 박스로 filtering 결과를 만든다. 박스는 여유 있게 키운다."""
+        height, width = img.shape[:2]
+        margin = self.keyframe.margin()
+        results = self.to_results(self.object.predict_tracks(), self.last_objects)
+        for key in results.keys():
+            results[key] = [grow_box(box, margin, width, height) for box in results[key]]
+        return results
     
     def blur(self, img, boxesList):
         if self.current_filter_info is None:
@@ -308,44 +519,65 @@ class Filtering:
         return img
     
     def set_filter(self, current_filter:Filter = None):
-        """변경될 필터 정보를 전달하고 필터를 변경해야 하는 상태라고 저장한다"""
-        if self.current_filter_info is None:
-            self.change_filter(current_filter)
-            return
-        self.change_filter_info = current_filter
-        self.filter_change = True
-        self.tracking_id_init()
+        """변경될 필터로 실행 계획을 만들어 둔다. 다음 프레임을 시작할 때 적용된다."""
+        self.change_filter(current_filter)
 
     def change_filter(self, current_filter:Filter = None):
-        """필터를 변경한다"""
+        """
+        필터를 변경한다. 실행 계획은 호출한 스레드에서 만들고, 스트림 스레드는 다음 프레임을 시작할 때 한 번에 교체한다.
+        필터를 바꿔도 tracker는 초기화하지 않는다.
+        """
         if (current_filter is None) | (current_filter == False) :
-            self.current_filter_info = None
+            self.next_plan = None
         else :
-            self.current_filter_info = current_filter
-            if "Human face" not in self.current_filter_info.object_filter:
-                self.current_filter_info.object_filter.append("Human face")
-            self.object.set_filter_classes(self.current_filter_info.object_filter)
-            self.object.set_known_faces(current_filter.face_filter.keys())
-
-    def filter_state_check(self, results):
-        """filter가 변경됐는지 확인하고 변경사항을 적용한다."""
-        temp = results
-        if self.filter_change is True:
-            self.change_filter(self.change_filter_info)
-            self.change_filter_info = None
-            self.filter_change = False
-            temp = {}
-            temp[-2] = results[-2]
-            temp[-1] = results[-1]
-            faces = []
-            for key, value in results.items():
-                if key > -1:
-                    faces.extend(value)
-            temp[-1].extend(value)
-        return temp
+            self.next_plan = FilterPlan.compile(current_filter, self.faceManager.face_gallery)
+
+    def begin_frame(self):
+        """새 실행 계획이 있으면 적용한다. 프레임 처리를 시작할 때 호출한다."""
+        plan = self.next_plan
+        if plan is not self.plan:
+            self.apply_plan(plan)
+
+    def apply_plan(self, plan):
+        """실행 계획을 교체하고, 바뀐 부분에 해당하는 상태만 초기화한다."""
+        previous = self.plan
+        self.plan = plan
+        if plan is None:
+            return
+        self.object.set_filter_classes(plan.origin_classes, plan.custom_names)
+        self.object.set_known_faces(plan.face_ids)
+        self.face_gallery = plan.face_gallery
+        if previous is None or previous.face_ids != plan.face_ids:
+            self.identity_cache.clear()  # 인식할 얼굴이 바뀌면 track별 인식 결과를 다시 구한다
+        detect_keys = ("origin_classes", "custom_names", "conf", "mag_ratio", "tile_size", "tile_overlap")
+        if previous is None or any(getattr(previous, key) != getattr(plan, key) for key in detect_keys):
+            # 탐지 설정이 바뀌면 다음 프레임은 새 설정으로 전체 탐지한다
+            self.keyframe.reset()
+            self.last_results = None
+            self.last_full_scan = 0
+            if self.motion_gate is not None:
+                self.motion_gate.reset()
+        elif self.last_results is not None:
+            # 필터에서 빠진 얼굴은 블러 처리한다
+            last_results = {-2: [], -1: []}
+            for key, boxes in self.last_results.items():
+                last_results.setdefault(key if key < 0 or key in plan.face_ids else -1, []).extend(boxes)
+            self.last_results = last_results
+
+    def get_face_gallery(self):
+        """현재 필터에 등록된 얼굴만 담은 갤러리를 반환한다. 저장소가 바뀌었다면 다시 만든다."""
+        face_gallery = self.faceManager.face_gallery
+        if self.face_gallery is None or self.face_gallery.version != face_gallery.version:
+            self.face_gallery = face_gallery.subset(self.plan.face_ids)
+            self.identity_cache.clear()
+        return self.face_gallery
 
     def tracking_id_init(self):
         """저장된 track_id 정보를 초기화한다."""
         self.init_id = True
             
 
+
+def copy_results(results):
+    """filtering 결과 딕셔너리를 박스 리스트까지 복사한다."""
+    return {key: [list(box) for box in boxes] for key, boxes in results.items()}
@@ -1,31 +1,137 @@
+import os
+import threading
+import numpy as np
 from ultralytics import YOLO
 from dataclasses import dataclass, field
-from deep_sort_realtime.deepsort_tracker import DeepSort
+from concurrent.futures import ThreadPoolExecutor
+from .model_export import load_model
+from .trackers import make_tracker
 
 
 class ModelManager:
     '''
     ObjectFilter클래스가 객체 인식에 사용하는 범용 모델과 사용자정의 모델이 들어있다.
+
+    모델은 처음 사용할 때 불러온다. preload로 백그라운드 스레드에서 미리 불러오고 빈 프레임으로 한 번 예측(warm-up)해 둘 수 있으며,
+    is_ready로 모델이 준비되었는지 알 수 있다.
+    사용자 정의 모델(bad.pt)은 필터에 사용자 정의 객체가 있을 때만 불러온다.
     '''
     _instance = None
-    orginModel: YOLO
-    customModel: YOLO
-    tracker: DeepSort
+    TRACK_MAX_AGE = 6  # 탐지되지 않은 track을 유지할 프레임 수 (keyframe 사이 프레임 동안 track이 사라지지 않도록)
+    # 추론 backend ("pytorch", "onnx", "openvino")와 정밀도 ("fp32", "fp16", "int8")
+    # CPU만 있는 컴퓨터에서는 onnx/openvino가 빠르다. 처음 실행할 때 한 번 내보내고 가중치 옆에 저장한다.
+    backend = os.environ.get("OBLIND_BACKEND", "pytorch")
+    precision = os.environ.get("OBLIND_PRECISION", "fp32")
+    # tracker ("deepsort", "deepsort-cnn", "iou"). deepsort는 얼굴 인식의 인코딩을 외형 embedding으로 쓰고, deepsort-cnn은 DeepSort의 외형 모델을 쓴다.
+    # iou는 외형 모델 없이 박스 위치만으로 추적하여 CPU에서 빠르다 (trackers.py 참고)
+    tracker_backend = os.environ.get("OBLIND_TRACKER", "deepsort")
+    WEIGHTS = {"origin": "models/yolov8n-oiv7.pt", "custom": "models/bad.pt"}
+    MODEL_NAMES = ("origin", "custom", "tracker")
+    executor: ThreadPoolExecutor
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
             cls._instance = super().__new__(cls, *args, **kwargs)
-            cls.orginModel = YOLO("models/yolov8n-oiv7.pt")
-            cls.customModel = YOLO("models/bad.pt")
-            cls.tracker = DeepSort(max_age=0)
+            cls._models = dict()
+            cls._locks = {name: threading.Lock() for name in cls.MODEL_NAMES}
+            cls._ready = {name: threading.Event() for name in cls.MODEL_NAMES}
+            # YOLO predictor는 스레드 안전하지 않으므로 모델마다 한 번에 한 스레드만 예측한다 (스트림 스레드, 얼굴 등록 스레드 등)
+            cls._inference_locks = {name: threading.Lock() for name in cls.WEIGHTS}
+            # 두 모델을 동시에 실행하기 위한 스레드 (모델마다 한 스레드씩)
+            cls.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="yolo")
         return cls._instance
-    
+
+    @property
+    def orginModel(self) -> YOLO:
+        return self.get_model("origin")
+
+    @property
+    def customModel(self) -> YOLO:
+        return self.get_model("custom")
+
+    @property
+    def tracker(self):
+        return self.get_model("tracker")
+
+    def get_model(self, name):
+        """name 모델을 반환한다. 아직 불러오지 않았으면 불러오고, 다른 스레드가 불러오는 중이면 기다린다."""
+        if not self._ready[name].is_set():
+            self.load(name)
+        return self._models[name]
+
+    def load(self, name, warm_up=False):
+        """name 모델을 불러온다. 여러 스레드에서 호출해도 한 번만 불러온다."""
+        with self._locks[name]:
+            if self._ready[name].is_set():
+                return
+            if name == "tracker":
+                model = make_tracker(self.tracker_backend, self.TRACK_MAX_AGE)
+            else:
+                model = load_model(self.WEIGHTS[name], self.backend, self.precision)
+                if warm_up:
+                    self.warm_up(model)
+            self._models[name] = model
+            self._ready[name].set()
+
+    def warm_up(self, model):
+        """모델이 학습된 크기(imgsz)의 빈 프레임으로 한 번 예측하여, 첫 프레임에서 그래프 준비 시간이 들지 않도록 한다."""
+        args = getattr(model.model, "args", None)
+        imgsz = args.get("imgsz", 640) if isinstance(args, dict) else 640
+        if isinstance(imgsz, (list, tuple)):
+            imgsz = max(imgsz)
+        try:
+            model.predict(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), verbose=False, imgsz=imgsz)
+        except Exception as e:
+            print("model warm-up failed :", e)
+
+    def preload(self, *names):
+        """names 모델들을 백그라운드 스레드에서 불러오고 warm-up한다. (names가 없으면 일반 모델과 tracker)"""
+        names = names or ("origin", "tracker")
+
+        def job():
+            for name in names:
+                try:
+                    self.load(name, warm_up=True)
+                except Exception as e:
+                    print(f"{name} model load failed :", e)
+
+        threading.Thread(target=job, name="model-loader", daemon=True).start()
+
+    def is_ready(self, name):
+        return self._ready[name].is_set()
+
+    def predict(self, model, source, **kwargs):
+        """model.predict를 모델별 inference lock 안에서 실행한다. 모델 예측은 모두 이 메서드를 거쳐야 한다."""
+        with self.inference_lock(model):
+            return model.predict(source, **kwargs)
+
+    def inference_lock(self, model):
+        """model의 inference lock. 불러온 모델이 아니면 일반 모델의 lock을 사용한다."""
+        for name, loaded in self._models.items():
+            if loaded is model and name in self._inference_locks:
+                return self._inference_locks[name]
+        return self._inference_locks["origin"]
+
+    def run_parallel(self, *jobs):
+        """
+        인자가 없는 함수(jobs)들을 스레드 풀에서 동시에 실행하고 결과를 순서대로 반환한다.
+        같은 모델을 사용하는 작업은 한 함수 안에서 차례로 실행해야 한다. (같은 모델의 예측은 inference lock으로 차례로 실행된다)
+        """
+        futures = [self.executor.submit(job) for job in jobs]
+        return [future.result() for future in futures]
+
     def get_label(self):
+        """
+        탐지할 수 있는 객체 이름 리스트. 사용자 정의 모델은 이미 불러왔을 때만 포함한다.
+        아직 불러오지 않았으면 백그라운드에서 불러오기 시작하고, 다음 호출부터 포함된다.
+        """
         label = list(self.orginModel.names.values())
+        if not self.is_ready("custom"):
+            self.preload("custom")
+            return label
         custom = list(self.customModel.names.values())
         for c in custom:
             if c not in label:
                 label.append(c)
 
         return label
-     
\ No newline at end of file
@@ -1,7 +1,11 @@
 from ultralytics import YOLO
 from ultralytics.utils.plotting import Annotator, colors
 from .ModelManager import ModelManager
+from .box_ops import nms, make_tiles, box_iou, merge_boxes, greedy_match
+from .detections import Detections, NO_ID
+from .track_identity import TrackIdentityTable
 import cv2
+import numpy as np
 
 class ObjectDetect:
     """
@@ -22,51 +26,59 @@ class ObjectDetect:
     """
 
     modelManager = ModelManager()
-    orginNames = None  # 일반 모델의 라벨
-    customNames = None  # 사용자 정의 모델의 라벨
     
     def __init__(self):
         """
-        ObjectDetect 클래스를 초기화합니다.
+        ObjectDetect 클래스를 초기화합니다. 모델은 처음 탐지할 때 불러옵니다. (ModelManager 참고)
         """
-        origin = self.modelManager.orginModel
-        custom = self.modelManager.customModel
-        self.orginNames = origin.names
-        self.customNames = custom.names
         self.originFilterClasses = []
+        self.customFilterNames = []  # 사용자 정의 모델로 인식할 객체 이름
         self.customFilterClasses = []    
         self.exclude_id = []
-        self.sticker_id = dict()
+        self.identities = TrackIdentityTable()  # track별로 스티커를 붙일 얼굴 id
+        self.association_iou = 0.5  # 탐지와 track을 같은 얼굴로 볼 최소 IoU
+
+    @property
+    def orginNames(self):
+        """일반 모델의 라벨"""
+        return self.modelManager.orginModel.names
+
+    @property
+    def customNames(self):
+        """사용자 정의 모델의 라벨"""
+        return self.modelManager.customModel.names
     
-    def set_filter_classes(self, filter_classes:list):
-        """인식할 객체 목록들을 설정한다."""
-        if "Human face" in filter_classes:
-            self.originFilterClasses.append(264)
-        for key, value in self.customNames.items():
-            if value in filter_classes:
-                self.customFilterClasses.append(key)
+    def set_filter_classes(self, origin_classes, custom_names):
+        """
+        인식할 객체 목록들을 설정한다. 이전 설정은 지운다.
+        origin_classes: 일반 모델의 class 번호, custom_names: 사용자 정의 모델로 인식할 객체 이름
+        사용자 정의 객체가 있으면 사용자 정의 모델을 미리 불러온다.
+        """
+        self.originFilterClasses = list(origin_classes)
+        self.customFilterNames = list(custom_names)
+        self.customFilterClasses = None
+        if self.customFilterNames and not self.modelManager.is_ready("custom"):
+            self.modelManager.preload("custom")
+
+    def custom_filter_classes(self):
+        """사용자 정의 모델로 인식할 class 번호 목록. 사용자 정의 객체가 없으면 모델을 불러오지 않는다."""
+        if self.customFilterClasses is None:
+            if not self.customFilterNames:
+                return []
+            self.customFilterClasses = [key for key, value in self.customNames.items() if value in self.customFilterNames]
+        return self.customFilterClasses
 
     def set_known_faces(self, face_list: list):
-        self.sticker_id = dict()
-        for face in face_list:
-            self.sticker_id[face] = []
-        #print("sticker_id: ", self.sticker_id)
+        """스티커를 붙일 얼굴 목록을 설정한다. 이미 track과 연결된 얼굴은 연결을 유지한다."""
+        self.identities.retain(face_list)
 
     def person_detect(self, img):
         results = self.detect(img, [381], self.modelManager.orginModel, self.orginNames)
-        boxList = []
-        for result in results:
-            box = [result[0][0], result[0][1], result[0][0]+result[0][2], result[0][1]+result[0][3]]
-            boxList.append(box)
-        return boxList
+        return results.boxes.tolist()
 
     def face_detect(self, img):
         results = self.detect(img, [264], self.modelManager.orginModel, self.orginNames)
-        boxList = []
-        for result in results:
-            box = [result[0][0], result[0][1], result[0][0]+result[0][2], result[0][1]+result[0][3]]
-            boxList.append(box)
-        return boxList
+        return results.boxes.tolist()
 
     def detect(self, img, filter_classes, model, names, confidence = 0.1, mag_ratio = 1):
         """
@@ -76,9 +88,8 @@ class ObjectDetect:
         model: 객체 인식 모델
         names: 객체 이름 목록
 
-        return: [[box], 신뢰도, 객체 이름]의 리스트를 반환한다.
+        return: 탐지 결과 (Detections)
         """
-        results = []
         height = img.shape[0]
         width = img.shape[1]
         height *= mag_ratio
@@ -98,25 +109,45 @@ class ObjectDetect:
         # print(confidence)
 
         if not filter_classes:
+            return Detections(names=names)
+        detection = self.modelManager.predict(model, img, verbose=False, classes=filter_classes, conf=confidence, max_det=600, show=False, imgsz=imgsize)[0]  # 일반 모델로 결과 예측
+        return Detections.from_yolo(detection, names)
+
+    def tiled_detect(self, img, filter_classes, model, names, confidence = 0.1, mag_ratio = 1, tile_size = 640, overlap = 0.2):
+        """
+        큰 이미지의 작은 객체를 찾기 위해 이미지를 겹치는 타일로 나누어 탐지합니다.
+        전체 이미지 탐지 결과와 타일들을 한 번에(batch) 탐지한 결과를 합친 뒤 NMS로 중복을 제거합니다.
+
+        return: 탐지 결과 (Detections)
+        """
+        results = self.detect(img, filter_classes, model, names, confidence, mag_ratio)
+        height, width = img.shape[:2]
+        if not filter_classes or max(height, width) <= tile_size:
             return results
-        detection = model.predict(img, verbose=False, classes=filter_classes, conf=confidence, max_det=600, show=False, imgsz=imgsize)[0]  # 일반 모델로 결과 예측
-
-        for data in detection.boxes.data.tolist():
-            confidence = float(data[4])
-            xmin, ymin, xmax, ymax = int(data[0]), int(data[1]), int(data[2]), int(data[3])
-            label = names[int(data[5])]
-            results.append([[xmin, ymin, xmax-xmin, ymax-ymin], confidence, label])
-        return results 
+
+        tiles = make_tiles(width, height, tile_size, overlap)
+        crops = [np.ascontiguousarray(img[y1:y2, x1:x2]) for x1, y1, x2, y2 in tiles]
+        imgsz = tile_size + (-tile_size % 32)
+        detections = self.modelManager.predict(model, crops, verbose=False, classes=filter_classes, conf=confidence, max_det=600, show=False, imgsz=imgsz)
+        results = Detections.concat([results] + [Detections.from_yolo(detection, names, x1, y1) for (x1, y1, _, _), detection in zip(tiles, detections)])
+
+        if len(results) == 0:
+            return results
+        # 겹치는 타일에서 같은 얼굴이 여러 번 잡히거나, 타일 경계에서 잘린 박스가 생긴다
+        return results[nms(results.boxes, results.scores, 0.5, ioa_threshold=0.8)]
     
-    def origin_detect(self, img, conf, mag_ratio):
+    def origin_detect(self, img, conf, mag_ratio, tile_size = 0, overlap = 0.2):
         """일반 YOLO 모델을 사용하여 객체를 탐지합니다.
 
         Args:
             img (numpy.ndarray): 원본 이미지입니다.
+            tile_size (int): 0보다 크면 tile_size 크기의 타일로 나누어 함께 탐지합니다.
 
         Returns:
-            tuple: 바운딩 박스의 목록과 각 객체가 얼굴인지를 나타내는 목록을 포함하는 튜플입니다.
+            Detections: 탐지 결과입니다.
         """
+        if tile_size > 0:
+            return self.tiled_detect(img, self.originFilterClasses, self.modelManager.orginModel, self.orginNames, conf, mag_ratio, tile_size, overlap)
         return self.detect(img, self.originFilterClasses, self.modelManager.orginModel, self.orginNames, conf, mag_ratio)
 
     def custom_detect(self, img):
@@ -126,53 +157,180 @@ class ObjectDetect:
             frame (numpy.ndarray): 원본 이미지입니다.
 
         Returns:
-            list: 탐지된 객체의 바운딩 박스 목록입니다.
-        """
-        results = self.detect(img, self.customFilterClasses, self.modelManager.customModel, self.customNames)
-        temp = results
-        for result in temp:
-            if result[2] == "middlefinger":
-                if result[1] < 0.8:
-                    results.remove(result)
-            else:
-                if result[1] < 0.3:
-                    results.remove(result)
-            
-        return results
+            Detections: 탐지 결과입니다.
+        """
+        filter_classes = self.custom_filter_classes()
+        if not filter_classes:
+            return Detections()
+        results = self.detect(img, filter_classes, self.modelManager.customModel, self.customNames)
+        return self.custom_threshold(results)
+
+    def custom_threshold(self, results):
+        """사용자 정의 모델 결과 중 객체별 기준 신뢰도보다 낮은 결과를 제거한다."""
+        return results.threshold({"middlefinger": 0.8}, default=0.3)
     
-    def object_track(self, img, results):
-        """주어진 이미지와 좌표에 대한 객체 추적 결과를 반환한다."""
-        detections = []
-        for value in results.values():
-            detections.extend(value)
-        tracks = self.modelManager.tracker.update_tracks(detections, frame=img)
-        last_results = dict()
-        last_results[-2] = []
-        last_results[-1] = []
-        for track in tracks:
-            float_box = track.to_ltrb(orig=True).tolist()
-            int_box = [int(float_box[0]), int(float_box[1]), int(float_box[2]), int(float_box[3])]
-            if not track.is_confirmed():
-                last_results[-1].append(int_box)
+    def detect_all(self, img, conf, mag_ratio, focus_img=None, tile_size=0, overlap=0.2):
+        """일반 모델과 사용자 정의 모델을 동시에 실행합니다.
+
+        Args:
+            img (numpy.ndarray): 원본 이미지입니다.
+            focus_img (numpy.ndarray): 일반 모델로 한 번 더 탐지할 집중 영역 이미지입니다. (없으면 None)
+            tile_size (int): 0보다 크면 일반 모델은 타일로 나누어 함께 탐지합니다. (origin_detect 참고)
+
+        Returns:
+            tuple: (일반 모델 결과, 집중 영역의 일반 모델 결과, 사용자 정의 모델 결과)
+        """
+        def origin_job():
+            origins = self.origin_detect(img, conf, mag_ratio, tile_size, overlap)
+            focus_origins = self.origin_detect(focus_img, conf, mag_ratio) if focus_img is not None else Detections()
+            return origins, focus_origins
+
+        (origins, focus_origins), customs = self.modelManager.run_parallel(origin_job, lambda: self.custom_detect(img))
+        return origins, focus_origins, customs
+
+    def detect_regions(self, img, regions, conf, mag_ratio, full_custom=False):
+        """이미지의 일부 영역(regions)만 잘라 두 모델로 동시에 탐지합니다. 각 모델은 잘라낸 영역들을 한 번에(batch) 탐지합니다.
+
+        Args:
+            regions (list): 탐지할 영역의 x1, y1, x2, y2 박스 리스트입니다.
+            full_custom (bool): True이면 사용자 정의 모델은 영역 대신 전체 이미지를 탐지합니다.
+
+        Returns:
+            tuple: (일반 모델 결과, 사용자 정의 모델 결과) 박스는 원본 이미지 좌표입니다.
+        """
+        regions = [region for region in regions if region[2] > region[0] and region[3] > region[1]]
+        crops = [np.ascontiguousarray(img[y1:y2, x1:x2]) for x1, y1, x2, y2 in regions]
+
+        def origin_job():
+            size = max(max(crop.shape[:2]) for crop in crops) * mag_ratio if crops else 0
+            return self.batch_detect(crops, regions, self.originFilterClasses, self.modelManager.orginModel, self.orginNames, conf, size)
+
+        def custom_job():
+            if full_custom:
+                return self.custom_detect(img)
+            filter_classes = self.custom_filter_classes()
+            if not filter_classes:
+                return Detections()
+            size = max(max(crop.shape[:2]) for crop in crops) if crops else 0
+            results = self.batch_detect(crops, regions, filter_classes, self.modelManager.customModel, self.customNames, 0.1, size)
+            return self.custom_threshold(results)
+
+        origins, customs = self.modelManager.run_parallel(origin_job, custom_job)
+        return origins, customs
+
+    def batch_detect(self, crops, regions, filter_classes, model, names, confidence, size):
+        """
+        잘라낸 이미지(crops)들을 한 번에 탐지하고, 박스를 원본 이미지 좌표로 옮긴다.
+        크기가 다른 이미지는 size(32의 배수로 올림) 정사각형에 맞추어 함께 탐지된다.
+
+        return: 탐지 결과 (Detections, 겹치는 영역의 중복은 NMS로 제거)
+        """
+        if not filter_classes or len(crops) == 0:
+            return Detections(names=names)
+        imgsz = max(32, int(size) + (-int(size) % 32))
+        detections = self.modelManager.predict(model, crops, verbose=False, classes=filter_classes, conf=confidence, max_det=600, show=False, imgsz=imgsz)
+        results = Detections.concat([Detections.from_yolo(detection, names, x1, y1) for (x1, y1, _, _), detection in zip(regions, detections)], names)
+        if len(crops) == 1 or len(results) == 0:
+            return results
+        return results[nms(results.boxes, results.scores, 0.5, ioa_threshold=0.8)]
+
+    def track_rois(self, width, height, pad=1.0, min_size=96):
+        """
+        살아있는 track의 예측 위치 주변 영역을 반환한다. 박스를 가로/세로로 박스 크기의 pad배씩 넓히고, 겹치는 영역은 합친다.
+
+        return: x1, y1, x2, y2 영역 리스트 (track이 없으면 빈 리스트)
+        """
+        rois = []
+        for track in self.modelManager.tracker.tracks:
+            if track.is_deleted() or track.time_since_update > self.modelManager.TRACK_MAX_AGE:
                 continue
-            box = track.to_ltwh(orig=True).tolist()
-            for face in results.keys():
-                if face != -1:
-                    if len(results[face]) != 0:
-                        if box == results[face][0][0]:
-                            self.sticker_id[face] = track.track_id
-
-            is_sticker = False
-            for sticker in self.sticker_id.keys():
-                if track.track_id == self.sticker_id[sticker]:
-                    last_results[sticker] = [int_box]
-                    is_sticker = True
-                    break
-            if is_sticker == False:
-                last_results[-1].append(int_box)
-
-        return last_results
+            x1, y1, x2, y2 = track.to_ltrb().tolist()
+            pad_x = max((x2 - x1) * pad, (min_size - (x2 - x1)) / 2)
+            pad_y = max((y2 - y1) * pad, (min_size - (y2 - y1)) / 2)
+            rois.append([max(0, int(x1 - pad_x)), max(0, int(y1 - pad_y)), min(width, int(x2 + pad_x)), min(height, int(y2 + pad_y))])
+        return merge_boxes(rois)
+
+    def object_track(self, img, faces, embeds=None, verdicts=None):
+        """
+        얼굴 탐지 결과로 tracker를 갱신하고 track별 결과를 반환한다.
+
+        Args:
+            faces (Detections): 얼굴 탐지 결과. 인식된 얼굴은 identity_ids에 얼굴 id가 들어있다.
+            embeds (list): 얼굴별 인코딩. tracker가 외형 embedding을 받는 경우(tracker_needs_embeds)에 넘긴다.
+            verdicts (list): 얼굴별 인식 판정 (얼굴 id, NO_ID, 판정이 없으면 None). 없으면 faces.identity_ids를 판정으로 사용한다.
+
+        Returns:
+            Detections: track별 박스, track_id와 스티커를 붙일 얼굴 id (나머지는 NO_ID, 블러)
+        """
+        tracks = [track for track in self.modelManager.tracker.update_tracks(faces.to_list(), frame=img, embeds=embeds) if not track.is_deleted()]
+        self.associate_identities(faces, tracks, verdicts)
+
+        boxes, track_ids, identity_ids = [], [], []
+        for track in tracks:
+            boxes.append(track.to_ltrb(orig=True).astype(int).tolist())
+            track_ids.append(track.track_id)
+            identity_ids.append(self.identities.get(track.track_id) if track.is_confirmed() else NO_ID)
+        return Detections(boxes, track_ids=track_ids, identity_ids=identity_ids)
+
+    def associate_identities(self, faces, tracks, verdicts=None):
+        """
+        이번 프레임에 갱신된 track과 얼굴 탐지 결과를 IoU 행렬로 짝짓고, 탐지의 인식 판정(verdicts)을 track별 연결 표(identities)에 반영한다.
+        짝이 없는 track은 연결을 그대로 유지하고, 죽은 track의 연결은 제거한다.
+        """
+        if verdicts is None:
+            verdicts = faces.identity_ids.tolist()
+        updated = [track for track in tracks if track.time_since_update == 0]
+        if len(faces) > 0 and len(updated) > 0:
+            track_boxes = np.asarray([track.to_ltrb(orig=True) for track in updated], dtype=np.float32)
+            for face_index, track_index in greedy_match(box_iou(faces.boxes, track_boxes), self.association_iou):
+                self.identities.observe(updated[track_index].track_id, verdicts[face_index])
+        self.identities.evict(track.track_id for track in tracks)
     
+    def predict_tracks(self):
+        """
+        탐지 없이 tracker의 칼만 필터로 모든 track을 한 프레임 진행시킵니다.
+
+        Returns:
+            Detections: object_track과 같은 형식의 결과
+        """
+        tracker = self.modelManager.tracker
+        tracker.predict()
+        boxes, track_ids, identity_ids = [], [], []
+        for track in tracker.tracks:
+            if track.is_deleted() or track.time_since_update > self.modelManager.TRACK_MAX_AGE:
+                continue
+            boxes.append(track.to_ltrb().astype(int).tolist())
+            track_ids.append(track.track_id)
+            identity_ids.append(self.identities.get(track.track_id) if track.is_confirmed() else NO_ID)
+        return Detections(boxes, track_ids=track_ids, identity_ids=identity_ids)
+
+    def match_track_ids(self, boxes, iou_threshold=0.3):
+        """
+        탐지된 박스를 현재 살아있는 track과 IoU로 짝지어 박스별 track_id를 반환한다.
+        boxes: x1, y1, x2, y2 형식의 박스 리스트
+
+        return: boxes와 같은 순서의 track_id 리스트. 짝이 없으면 None
+        """
+        track_ids = [None] * len(boxes)
+        tracks = [track for track in self.modelManager.tracker.tracks if not track.is_deleted()]
+        if len(boxes) == 0 or len(tracks) == 0:
+            return track_ids
+
+        # IoU가 큰 쌍부터 차례로 짝짓는다
+        iou = box_iou(boxes, [track.to_ltrb() for track in tracks])
+        for box_index, track_index in greedy_match(iou, iou_threshold):
+            track_ids[box_index] = tracks[track_index].track_id
+        return track_ids
+
+    def tracker_needs_embeds(self):
+        """tracker가 얼굴 인코딩을 외형 embedding으로 받는지 반환한다."""
+        return getattr(self.modelManager.tracker, "needs_embeds", False)
+
+    def live_track_ids(self):
+        """현재 살아있는 track_id 목록을 반환한다."""
+        return [track.track_id for track in self.modelManager.tracker.tracks if not track.is_deleted()]
+
     def init_exclude_id(self):
         """저장된 track_id를 초기화한다"""
-        self.exclude_id = []
\ No newline at end of file
+        self.exclude_id = []
+        self.identities.clear()
\ No newline at end of file
@@ -1,8 +1,27 @@
-from .path_manager import PathManager
-from .Filtering import Filtering
-from .filter_manager import FilterManager
-from .face_manager import FaceManager
-from .filter_info import Filter
-from .face_info import Face
-from .sticker_manager import StickerManager
-from .ObjectDetect import ObjectDetect
\ No newline at end of file
+import importlib
+
+# 패키지에서 바로 가져올 수 있는 클래스와 그 클래스가 정의된 모듈.
+# 처음 사용할 때 import하므로, numpy만 사용하는 모듈(face_gallery, box_ops, detections 등)은
+# YOLO, dlib, PySide6 없이도 import할 수 있다.
+_EXPORTS = {
+    "PathManager": ".path_manager",
+    "Filtering": ".Filtering",
+    "FilterManager": ".filter_manager",
+    "FaceManager": ".face_manager",
+    "Filter": ".filter_info",
+    "Face": ".face_info",
+    "StickerManager": ".sticker_manager",
+    "ObjectDetect": ".ObjectDetect",
+    "ModelManager": ".ModelManager",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
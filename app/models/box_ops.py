@@ -0,0 +1,133 @@
+import numpy as np
+
+# 박스 연산 함수들. 박스는 (N×4) x1, y1, x2, y2 형식의 배열
+
+
+def box_iou(boxes_a, boxes_b):
+    """(N×4), (M×4) 박스의 IoU 행렬 (N×M)"""
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    intersection = box_intersection(boxes_a, boxes_b)
+    union = box_area(boxes_a)[:, None] + box_area(boxes_b)[None, :] - intersection
+    return intersection / np.maximum(union, 1e-6)
+
+
+def box_ioa(boxes_a, boxes_b):
+    """(N×4), (M×4) 박스의 교집합 넓이를 boxes_a 넓이로 나눈 행렬 (N×M). boxes_a가 boxes_b에 얼마나 포함되는지"""
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    return box_intersection(boxes_a, boxes_b) / np.maximum(box_area(boxes_a)[:, None], 1e-6)
+
+
+def box_intersection(boxes_a, boxes_b):
+    """(N×4), (M×4) 박스의 교집합 넓이 행렬 (N×M)"""
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    return np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+
+def box_area(boxes):
+    """(N×4) 박스의 넓이 (N)"""
+    return np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+
+def nms(boxes, scores, iou_threshold=0.5, ioa_threshold=None):
+    """
+    Non-Maximum Suppression. 점수가 높은 박스부터 남기고, 남긴 박스와 IoU가 iou_threshold 이상인 박스를 제거합니다.
+    ioa_threshold를 주면 남긴 박스에 ioa_threshold 비율 이상 포함되는 박스도 제거합니다. (타일 경계에서 잘린 박스)
+
+    Returns:
+    - 남길 박스의 index 배열 (점수 내림차순)
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    order = np.argsort(-np.asarray(scores, dtype=np.float32), kind='stable')
+    keep = []
+    while len(order) > 0:
+        best = order[0]
+        keep.append(best)
+        if len(order) == 1:
+            break
+        rest = boxes[order[1:]]
+        remove = box_iou(boxes[best:best + 1], rest)[0] >= iou_threshold
+        if ioa_threshold is not None:
+            remove |= box_ioa(rest, boxes[best:best + 1])[:, 0] >= ioa_threshold
+        order = order[1:][~remove]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def not_duplicated(new_boxes, boxes, ioa_threshold=0.7):
+    """
+    new_boxes 중 boxes의 어떤 박스에도 ioa_threshold 비율 이상 포함되지 않는 박스를 나타내는 bool 배열을 반환합니다.
+    """
+    new_boxes = np.asarray(new_boxes, dtype=np.float32).reshape(-1, 4)
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    if len(new_boxes) == 0 or len(boxes) == 0:
+        return np.ones(len(new_boxes), dtype=bool)
+    return (box_ioa(new_boxes, boxes) < ioa_threshold).all(axis=1)
+
+
+def greedy_match(scores, threshold):
+    """
+    (N×M) 점수 행렬(IoU 등)에서 점수가 큰 쌍부터 차례로 짝짓는다. 이미 짝지어진 행, 열은 건너뛰고 threshold 미만이면 멈춘다.
+
+    Returns:
+    - (행 index, 열 index) 리스트
+    """
+    scores = np.asarray(scores)
+    pairs = []
+    if scores.size == 0:
+        return pairs
+    used_rows, used_cols = set(), set()
+    for index in np.argsort(scores, axis=None, kind='stable')[::-1]:
+        row, col = np.unravel_index(index, scores.shape)
+        if scores[row, col] < threshold:
+            break
+        if row in used_rows or col in used_cols:
+            continue
+        used_rows.add(row)
+        used_cols.add(col)
+        pairs.append((int(row), int(col)))
+    return pairs
+
+
+def make_tiles(width, height, tile_size, overlap=0.2):
+    """
+    width×height 이미지를 tile_size 크기의 타일로 나눕니다. 이웃한 타일은 overlap 비율만큼 겹칩니다.
+
+    Returns:
+    - 타일의 x1, y1, x2, y2 리스트 (마지막 타일은 이미지 끝에 맞춘다)
+    """
+    stride = max(1, int(tile_size * (1 - overlap)))
+    xs = tile_starts(width, tile_size, stride)
+    ys = tile_starts(height, tile_size, stride)
+    return [[x, y, min(x + tile_size, width), min(y + tile_size, height)] for y in ys for x in xs]
+
+
+def tile_starts(length, tile_size, stride):
+    """한 축의 타일 시작 좌표"""
+    if length <= tile_size:
+        return [0]
+    starts = list(range(0, length - tile_size, stride))
+    starts.append(length - tile_size)
+    return starts
+
+
+def merge_boxes(boxes):
+    """서로 겹치는 박스들을 합쳐(두 박스를 모두 포함하는 박스) 겹치지 않는 박스 리스트로 만든다."""
+    boxes = [list(box) for box in boxes]
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    boxes[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del boxes[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return boxes
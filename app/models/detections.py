@@ -0,0 +1,108 @@
+import numpy as np
+
+NO_ID = -1  # track_id, identity_id가 없음
+
+
+class Detections:
+    """
+    탐지 결과 묶음입니다. 박스 하나마다 Python 리스트를 만드는 대신 열(column)별 NumPy 배열로 저장합니다.
+
+    속성:
+        boxes (N×4 int32): x1, y1, x2, y2 박스
+        scores (N float32): 신뢰도
+        class_ids (N int32): 모델의 class 번호 (이름은 names[class_id])
+        track_ids (N int64): tracker의 track_id (없으면 NO_ID)
+        identity_ids (N int64): 인식된 얼굴 id (없으면 NO_ID, 블러 처리)
+        names (dict): class 번호별 객체 이름. 같은 모델의 결과끼리만 합친다
+    """
+    __slots__ = ("boxes", "scores", "class_ids", "track_ids", "identity_ids", "names")
+
+    def __init__(self, boxes=None, scores=None, class_ids=None, track_ids=None, identity_ids=None, names=None):
+        self.boxes = np.asarray(boxes if boxes is not None else [], dtype=np.int32).reshape(-1, 4)
+        count = len(self.boxes)
+        self.scores = column(scores, count, np.float32, 1.0)
+        self.class_ids = column(class_ids, count, np.int32, 0)
+        self.track_ids = column(track_ids, count, np.int64, NO_ID)
+        self.identity_ids = column(identity_ids, count, np.int64, NO_ID)
+        self.names = names if names is not None else {}
+
+    @classmethod
+    def from_yolo(cls, detection, names, offset_x=0, offset_y=0):
+        """YOLO 예측 결과(Results)를 변환한다. offset만큼 박스를 옮긴다."""
+        data = detection.boxes.data
+        data = data.cpu().numpy() if hasattr(data, "cpu") else np.asarray(data)
+        data = data.reshape(-1, data.shape[-1]) if data.size else np.zeros((0, 6), dtype=np.float32)
+        boxes = data[:, :4].astype(np.int32)  # 소수점은 버린다
+        boxes[:, [0, 2]] += offset_x
+        boxes[:, [1, 3]] += offset_y
+        return cls(boxes, data[:, 4], data[:, 5].astype(np.int32), names=names)
+
+    @classmethod
+    def concat(cls, batches, names=None):
+        """여러 묶음을 하나로 합친다."""
+        batches = [batch for batch in batches if batch is not None]
+        if names is None:
+            names = next((batch.names for batch in batches if batch.names), {})
+        if len(batches) == 0:
+            return cls(names=names)
+        return cls(np.concatenate([batch.boxes for batch in batches]),
+                   np.concatenate([batch.scores for batch in batches]),
+                   np.concatenate([batch.class_ids for batch in batches]),
+                   np.concatenate([batch.track_ids for batch in batches]),
+                   np.concatenate([batch.identity_ids for batch in batches]),
+                   names)
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __getitem__(self, index):
+        """index(정수 배열, bool 배열, slice)에 해당하는 결과만 담은 새 묶음"""
+        if isinstance(index, (int, np.integer)):
+            index = [index]
+        return Detections(self.boxes[index], self.scores[index], self.class_ids[index],
+                          self.track_ids[index], self.identity_ids[index], self.names)
+
+    def copy(self):
+        return self[np.arange(len(self))]
+
+    @property
+    def xywh(self):
+        """(N×4) x1, y1, w, h 박스"""
+        boxes = self.boxes.copy()
+        boxes[:, 2:] -= boxes[:, :2]
+        return boxes
+
+    @property
+    def labels(self):
+        """결과별 객체 이름 리스트"""
+        return [self.names.get(int(class_id), str(class_id)) for class_id in self.class_ids]
+
+    def shifted(self, offset_x, offset_y):
+        """박스를 offset만큼 옮긴 새 묶음"""
+        moved = self.copy()
+        moved.boxes[:, [0, 2]] += offset_x
+        moved.boxes[:, [1, 3]] += offset_y
+        return moved
+
+    def label_mask(self, labels):
+        """객체 이름이 labels에 들어있는 결과를 나타내는 bool 배열"""
+        ids = [class_id for class_id, name in self.names.items() if name in labels]
+        return np.isin(self.class_ids, ids)
+
+    def threshold(self, min_scores, default=0.0):
+        """객체 이름별 최소 신뢰도(min_scores, 없으면 default)보다 낮은 결과를 제거한 새 묶음"""
+        minimum = np.full(len(self), default, dtype=np.float32)
+        for label, score in min_scores.items():
+            minimum[self.label_mask([label])] = score
+        return self[self.scores >= minimum]
+
+    def to_list(self):
+        """[[x, y, w, h], 신뢰도, 객체 이름] 리스트로 변환한다. (DeepSort 입력 형식)"""
+        return [[box, score, label] for box, score, label in zip(self.xywh.tolist(), self.scores.tolist(), self.labels)]
+
+
+def column(values, count, dtype, fill):
+    """길이 count의 dtype 배열. values가 None이면 fill로 채운다."""
+    if values is None:
+        return np.full(count, fill, dtype=dtype)
+    return np.asarray(values, dtype=dtype).reshape(count)
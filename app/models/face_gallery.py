@@ -0,0 +1,296 @@
+import numpy as np
+from .face_store import FaceEncodingStore, ENCODING_SIZE
+from .face_index import make_index, nearest_rows, face_distance_matrix
+
+
+class FaceGallery:
+    """
+    얼굴 인코딩 저장소를 메모리에 상주시키는 얼굴 갤러리입니다.
+
+    저장소는 처음 사용할 때 한 번만 읽고(mmap), 이후 등록/삭제는 add_encodings, remove_encodings로
+    갤러리와 인덱스에 바로 반영됩니다. version은 reload 될 때마다 증가하며,
+    subset 으로 만든 갤러리가 오래되었는지 판단하는 데 사용됩니다.
+
+    사람마다 등록 사진 인코딩의 평균(prototype)과 반지름(평균에서 가장 먼 사진까지의 거리)을 유지합니다.
+    먼저 prototype과 비교해 가능성이 있는 top_k명을 고르고, 그 사람들의 사진 인코딩만 전부 비교합니다.
+    검색할 인코딩이 index_threshold개 이상이면 근사 최근접 탐색 인덱스(IVFIndex)를 사용합니다.
+    """
+
+    def __init__(self, known_faces_path=None, index_threshold=5000, nprobe=8, top_k=3):
+        self.known_faces_path = known_faces_path
+        self.index_threshold = index_threshold
+        self.nprobe = nprobe
+        self.top_k = top_k
+        self.encodings = np.zeros((0, ENCODING_SIZE), dtype=np.float32)  # (N×128) 인코딩 행렬 (저장소 순서)
+        self.face_ids = np.zeros(0, dtype=np.int64)  # 행별 face_id
+        self.face_numbers = np.zeros(0, dtype=np.int64)  # 행별 face_number
+        self.alive = np.zeros(0, dtype=bool)  # 행별 삭제 여부 (삭제된 행은 reload 전까지 남아있다)
+        self.rows_by_id = dict()  # {face_id: 살아있는 행 번호 배열}
+        self.prototype_ids = np.zeros(0, dtype=np.int64)  # prototype별 face_id
+        self.prototypes = np.zeros((0, ENCODING_SIZE), dtype=np.float32)  # (P×128) 사람별 평균 인코딩
+        self.radii = np.zeros(0, dtype=np.float32)  # 사람별 반지름. 사진이 없으면 inf
+        self.slots = dict()  # {face_id: prototype 행 번호}
+        self.index = None
+        self.version = 0
+        self.revision = 0  # 행이 추가/삭제될 때마다 증가
+        self.loaded = False
+
+    def load(self):
+        """저장소를 아직 읽지 않았다면 읽어온다."""
+        if not self.loaded:
+            self.reload()
+
+    def reload(self):
+        """저장소를 다시 읽어 갤러리를 재구성한다."""
+        self.release()
+        store = FaceEncodingStore(self.known_faces_path)
+        store.compact_if_needed()  # mmap을 놓은 지금 삭제된 행을 정리한다
+        encodings, face_ids, face_numbers = store.load_alive()
+        self.set_encodings(encodings, face_ids, face_numbers)
+        self.loaded = True
+        self.version += 1
+
+    def release(self):
+        """저장소 파일을 다시 쓸 수 있도록 mmap 된 행렬을 놓는다. 다음 사용 때 다시 읽는다."""
+        self.set_encodings(np.zeros((0, ENCODING_SIZE), dtype=np.float32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        self.loaded = False
+
+    def set_encodings(self, encodings, face_ids, face_numbers):
+        """인코딩 행렬과 행별 face_id, face_number를 갤러리에 반영하고 prototype을 계산한다. 인덱스는 prepare_index나 다음 검색 때 만든다."""
+        self.encodings = encodings
+        self.face_ids = np.asarray(face_ids, dtype=np.int64)
+        self.face_numbers = np.asarray(face_numbers, dtype=np.int64)
+        self.alive = np.ones(len(self.face_ids), dtype=bool)
+        self.index = None
+        self.build_prototypes()
+        self.revision += 1
+
+    def build_prototypes(self):
+        """모든 사람의 prototype과 반지름을 한 번에 계산한다."""
+        rows = np.flatnonzero(self.alive)
+        rows = rows[np.argsort(self.face_ids[rows], kind='stable')]
+        ids, starts, counts = np.unique(self.face_ids[rows], return_index=True, return_counts=True)
+        self.rows_by_id = dict(zip(ids.tolist(), np.split(rows, starts[1:]))) if len(rows) else dict()
+        self.prototype_ids = ids.astype(np.int64)
+        self.slots = {face_id: slot for slot, face_id in enumerate(ids.tolist())}
+        if len(rows) == 0:
+            self.prototypes = np.zeros((0, ENCODING_SIZE), dtype=np.float32)
+            self.radii = np.zeros(0, dtype=np.float32)
+            return
+        encodings = np.asarray(self.encodings[rows], dtype=np.float64)
+        prototypes = np.add.reduceat(encodings, starts) / counts[:, None]
+        spread = np.linalg.norm(encodings - np.repeat(prototypes, counts, axis=0), axis=1)
+        self.prototypes = prototypes.astype(np.float32)
+        self.radii = np.maximum.reduceat(spread, starts).astype(np.float32)
+
+    def update_prototype(self, face_id):
+        """face_id 한 사람의 prototype과 반지름만 다시 계산한다."""
+        rows = self.rows_by_id.get(face_id, np.zeros(0, dtype=np.int64))
+        slot = self.slots.get(face_id)
+        if slot is None:
+            if len(rows) == 0:
+                return
+            slot = len(self.prototype_ids)
+            self.prototype_ids = np.append(self.prototype_ids, face_id)
+            self.prototypes = np.concatenate([self.prototypes, np.zeros((1, ENCODING_SIZE), dtype=np.float32)])
+            self.radii = np.append(self.radii, np.float32(np.inf))
+            self.slots[face_id] = slot
+        if len(rows) == 0:
+            self.radii[slot] = np.inf  # 사진이 없는 사람은 검색되지 않는다
+            return
+        encodings = np.asarray(self.encodings[rows], dtype=np.float64)
+        prototype = encodings.mean(axis=0)
+        self.prototypes[slot] = prototype
+        self.radii[slot] = np.linalg.norm(encodings - prototype, axis=1).max()
+
+    def add_encodings(self, encodings, face_ids, face_numbers):
+        """새로 등록된 인코딩을 갤러리 끝에 추가하고 해당 사람의 prototype을 갱신한다."""
+        if not self.loaded:
+            return  # 다음에 저장소를 읽을 때 함께 읽힌다
+        encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+        face_ids = np.asarray(face_ids, dtype=np.int64)
+        start = len(self.face_ids)
+        if self.index is not None:
+            self.index.add(encodings)
+            self.encodings = self.index.encodings
+        else:
+            self.encodings = np.concatenate([self.encodings, encodings])
+        self.face_numbers = np.concatenate([self.face_numbers, np.asarray(face_numbers, dtype=np.int64)])
+        self.face_ids = np.concatenate([self.face_ids, face_ids])
+        self.alive = np.concatenate([self.alive, np.ones(len(face_ids), dtype=bool)])
+        for face_id in np.unique(face_ids).tolist():
+            rows = start + np.flatnonzero(face_ids == face_id)
+            self.rows_by_id[face_id] = np.concatenate([self.rows_by_id.get(face_id, np.zeros(0, dtype=np.int64)), rows])
+            self.update_prototype(face_id)
+        self.revision += 1
+        self.prepare_index()  # 등록으로 인덱스가 필요해졌다면 스트림 스레드가 아닌 등록하는 스레드에서 만든다
+
+    def remove_encodings(self, face_id, face_number=None):
+        """face_id의 인코딩을 갤러리에서 제외하고 prototype을 갱신한다. face_number를 주면 그 인코딩 하나만 제외한다."""
+        if not self.loaded:
+            return
+        face_id = int(face_id)
+        rows = self.rows_by_id.get(face_id, np.zeros(0, dtype=np.int64))
+        if face_number is None:
+            removed, remaining = rows, rows[:0]
+        else:
+            same = self.face_numbers[rows] == int(face_number)
+            removed, remaining = rows[same], rows[~same]
+        if len(removed) == 0:
+            return
+        alive = self.alive.copy()
+        alive[removed] = False
+        self.alive = alive
+        self.rows_by_id[face_id] = remaining
+        self.update_prototype(face_id)
+        self.revision += 1
+
+    def get_index(self):
+        """검색 인덱스를 반환한다. 없으면 만든다."""
+        if self.index is None:
+            self.index = make_index(self.encodings, self.index_threshold, nprobe=self.nprobe)
+        return self.index
+
+    def prepare_index(self):
+        """검색할 인코딩이 index_threshold개 이상이면 인덱스를 미리 만든다. (첫 검색이 인덱스를 만들지 않도록)"""
+        if len(self) >= self.index_threshold:
+            self.get_index()
+
+    def subset(self, face_ids):
+        """face_ids에 해당하는 사람만 검색하는 갤러리를 반환한다."""
+        self.load()
+        return FaceGallerySubset(self, face_ids)
+
+    def search(self, face_encodings, allowed=None, slots=None, tolerance=0.3):
+        """
+        얼굴 인코딩들을 갤러리와 한 번에 비교합니다.
+
+        Args:
+        - face_encodings: (M×128) 얼굴 인코딩 행렬 혹은 인코딩 리스트
+        - allowed: 검색할 행을 나타내는 bool 배열 (None이면 삭제되지 않은 전체)
+        - slots: 검색할 사람의 prototype 행 번호 배열 (None이면 전체). allowed와 같은 사람을 가리켜야 한다.
+        - tolerance: 허용 거리
+
+        Returns:
+        - 얼굴마다 (face_id, 거리)의 리스트. 허용 거리 안에 아무도 없으면 (None, None)
+        """
+        face_encodings = np.asarray(face_encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+        if len(face_encodings) == 0:
+            return []
+        encodings, face_ids, alive = self.encodings, self.face_ids, self.alive
+        if allowed is None:
+            allowed = alive
+        if len(allowed) > len(encodings):
+            # 저장소를 다시 읽는 중이라 행이 줄어든 경우
+            return [(None, None)] * len(face_encodings)
+
+        if allowed.sum() < self.index_threshold:
+            rows, distances = self.search_prototypes(face_encodings, encodings, slots, tolerance)
+        else:
+            size = min(len(allowed), len(alive))
+            rows, distances = self.get_index().search(face_encodings, allowed[:size] & alive[:size])
+
+        matches = []
+        for row, distance in zip(rows, distances):
+            if row < 0 or row >= len(face_ids) or distance >= tolerance:
+                matches.append((None, None))
+            else:
+                matches.append((int(face_ids[row]), float(distance)))
+        return matches
+
+    def search_prototypes(self, face_encodings, encodings, slots, tolerance):
+        """
+        prototype으로 후보를 고른 뒤 후보의 사진 인코딩과 비교합니다.
+
+        prototype까지의 거리에서 반지름을 뺀 값은 그 사람의 어떤 사진까지의 거리보다도 작으므로(삼각 부등식),
+        이 값이 tolerance 이상인 사람은 비교하지 않고, 나머지 중 이 값이 작은 top_k명만 비교합니다.
+
+        Returns:
+        - rows: 얼굴별 가장 가까운 행 번호 (없으면 -1)
+        - distances: 얼굴별 거리 (없으면 inf)
+        """
+        prototype_ids, prototypes, radii, rows_by_id = self.prototype_ids, self.prototypes, self.radii, self.rows_by_id
+        rows = np.full(len(face_encodings), -1, dtype=np.int64)
+        distances = np.full(len(face_encodings), np.inf, dtype=np.float32)
+        if slots is None:
+            slots = np.arange(len(prototype_ids))
+        slots = slots[slots < len(radii)]
+        slots = slots[np.isfinite(radii[slots])]  # 사진이 모두 삭제된 사람(반지름 inf)은 후보에서 뺀다
+        if len(slots) == 0:
+            return rows, distances
+
+        lower = face_distance_matrix(prototypes[slots], face_encodings) - radii[slots]
+        k = min(self.top_k, len(slots))
+        nearest = np.argpartition(lower, k - 1, axis=1)[:, :k]
+        for i, candidates in enumerate(nearest):
+            candidates = candidates[lower[i, candidates] < tolerance]
+            if len(candidates) == 0:
+                continue
+            candidate_rows = np.concatenate([rows_by_id.get(int(prototype_ids[slots[c]]), np.zeros(0, dtype=np.int64)) for c in candidates])
+            candidate_rows = candidate_rows[candidate_rows < len(encodings)]
+            row, distance = nearest_rows(encodings, candidate_rows, face_encodings[i:i + 1])
+            rows[i], distances[i] = row[0], distance[0]
+        return rows, distances
+
+    def match(self, face_encodings, tolerance=0.3):
+        """프레임의 모든 얼굴 인코딩을 갤러리 전체와 한 번에 비교합니다. 반환값은 search와 같습니다."""
+        return self.search(face_encodings, tolerance=tolerance)
+
+    def identify(self, face_encoding, tolerance=0.3):
+        """
+        갤러리에서 face_encoding과 가장 가까운 사람을 찾습니다.
+
+        Returns:
+        - 인식된 사람의 face_id. 허용 거리 안에 아무도 없으면 None
+        """
+        if len(face_encoding) == 0:
+            return None
+        face_id, _ = self.match(face_encoding[:1], tolerance)[0]
+        return face_id
+
+    def is_known(self, face_encoding, tolerance=0.3):
+        """face_encoding이 갤러리에 등록된 사람인지 반환한다."""
+        return self.identify(face_encoding, tolerance) is not None
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+
+class FaceGallerySubset(FaceGallery):
+    """
+    FaceGallery 중 일부 사람만 검색하는 갤러리입니다. 인코딩, prototype, 인덱스는 원본 갤러리와 공유합니다.
+    """
+
+    def __init__(self, gallery: FaceGallery, face_ids):
+        self.gallery = gallery
+        self.subset_ids = np.asarray([int(face_id) for face_id in face_ids], dtype=np.int64)
+        self.allowed = np.zeros(0, dtype=bool)
+        self.slots = np.zeros(0, dtype=np.int64)
+        self.revision = None
+        self.version = gallery.version
+        self.loaded = True
+
+    def get_allowed(self):
+        """
+        원본 갤러리에서 검색할 행(bool 배열)과 prototype 행 번호를 반환한다. 원본에 행이 추가/삭제되면 다시 계산한다.
+        """
+        gallery = self.gallery
+        if self.revision != gallery.revision:
+            revision = gallery.revision
+            face_ids, alive = gallery.face_ids, gallery.alive
+            rows = min(len(face_ids), len(alive))  # 원본이 갱신되는 도중일 수 있다
+            self.allowed = np.isin(face_ids[:rows], self.subset_ids) & alive[:rows]
+            self.slots = np.flatnonzero(np.isin(gallery.prototype_ids, self.subset_ids))
+            self.revision = revision
+        return self.allowed, self.slots
+
+    def prepare_index(self):
+        if len(self) >= self.gallery.index_threshold:
+            self.gallery.get_index()
+
+    def match(self, face_encodings, tolerance=0.3):
+        allowed, slots = self.get_allowed()
+        return self.gallery.search(face_encodings, allowed, slots, tolerance)
+
+    def __len__(self):
+        return int(self.get_allowed()[0].sum())
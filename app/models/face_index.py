@@ -0,0 +1,142 @@
+import numpy as np
+
+
+# 인코딩 행렬 사이의 거리표를 한 번에 계산하는 함수
+def face_distance_matrix(known_encodings, face_encodings):
+    """
+    등록된 인코딩 행렬과 프레임의 얼굴 인코딩 행렬 사이의 유클리드 거리표를 계산합니다.
+    
+    Args:
+    - known_encodings: 등록된 얼굴 인코딩 (N×128) float32 행렬
+    - face_encodings: 프레임에서 구한 얼굴 인코딩 (M×128) 행렬
+    
+    Returns:
+    - (M×N) 거리표
+    """
+    known_encodings = np.asarray(known_encodings, dtype=np.float32)
+    face_encodings = np.asarray(face_encodings, dtype=np.float32).reshape(-1, known_encodings.shape[1])
+    # |a-b|^2 = |a|^2 + |b|^2 - 2ab
+    squared = (np.einsum('ij,ij->i', face_encodings, face_encodings)[:, None]
+               + np.einsum('ij,ij->i', known_encodings, known_encodings)[None, :]
+               - 2 * face_encodings @ known_encodings.T)
+    np.maximum(squared, 0, out=squared)
+    return np.sqrt(squared)
+
+
+class BruteForceIndex:
+    """
+    모든 인코딩과 거리를 계산하는 정확한 최근접 탐색 인덱스입니다. 작은 갤러리에 사용합니다.
+    """
+
+    def __init__(self, encodings):
+        self.encodings = encodings
+
+    def add(self, encodings):
+        """인코딩을 인덱스 끝에 추가한다. 행 번호는 추가된 순서대로 이어진다."""
+        self.encodings = np.concatenate([self.encodings, np.asarray(encodings, dtype=np.float32)])
+
+    def search(self, face_encodings, allowed=None):
+        """
+        얼굴마다 가장 가까운 행을 찾습니다.
+
+        Args:
+        - face_encodings: (M×128) 얼굴 인코딩 행렬
+        - allowed: 검색할 행을 나타내는 bool 배열 (None이면 전체)
+
+        Returns:
+        - rows: 얼굴별 가장 가까운 행 번호 (없으면 -1)
+        - distances: 얼굴별 거리 (없으면 inf)
+        """
+        candidates = np.arange(len(self.encodings)) if allowed is None else np.flatnonzero(allowed)
+        return nearest_rows(self.encodings, candidates, face_encodings)
+
+    def __len__(self):
+        return len(self.encodings)
+
+
+class IVFIndex:
+    """
+    k-means로 인코딩을 nlist개의 구역으로 나누고, 얼굴과 가까운 nprobe개의 구역만 탐색하는 근사 최근접 탐색 인덱스입니다.
+    nprobe를 늘리면 recall이 오르고 속도는 느려집니다. (nprobe == nlist 이면 정확한 탐색과 같다)
+    """
+
+    def __init__(self, encodings, nlist=None, nprobe=8, iterations=10, seed=0):
+        self.encodings = encodings
+        self.nlist = nlist or max(1, int(np.sqrt(len(encodings))))
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.seed = seed
+        self.train()
+
+    def train(self):
+        """k-means로 구역 중심을 학습하고 모든 행을 구역에 배정한다."""
+        data = np.asarray(self.encodings, dtype=np.float32)
+        rng = np.random.default_rng(self.seed)
+        nlist = min(self.nlist, len(data))
+        centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+        for _ in range(self.iterations):
+            assign = np.argmin(face_distance_matrix(centroids, data), axis=1)
+            for i in range(nlist):
+                members = data[assign == i]
+                if len(members) > 0:
+                    centroids[i] = members.mean(axis=0)
+        self.centroids = centroids
+        self.trained_size = len(data)
+        assign = np.argmin(face_distance_matrix(centroids, data), axis=1)
+        self.lists = [np.flatnonzero(assign == i) for i in range(nlist)]
+
+    def add(self, encodings):
+        """인코딩을 인덱스 끝에 추가하고 가장 가까운 구역에 배정한다. 크기가 학습 때의 4배가 되면 다시 학습한다."""
+        encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, self.encodings.shape[1])
+        start = len(self.encodings)
+        self.encodings = np.concatenate([self.encodings, encodings])
+        if len(self.encodings) >= self.trained_size * 4:
+            self.train()
+            return
+        assign = np.argmin(face_distance_matrix(self.centroids, encodings), axis=1)
+        for offset, i in enumerate(assign):
+            self.lists[i] = np.append(self.lists[i], start + offset)
+
+    def search(self, face_encodings, allowed=None):
+        """BruteForceIndex.search와 같지만 가까운 nprobe개 구역의 행만 비교한다."""
+        face_encodings = np.asarray(face_encodings, dtype=np.float32).reshape(-1, self.encodings.shape[1])
+        rows = np.full(len(face_encodings), -1, dtype=np.int64)
+        distances = np.full(len(face_encodings), np.inf, dtype=np.float32)
+        if len(face_encodings) == 0:
+            return rows, distances
+
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argsort(face_distance_matrix(self.centroids, face_encodings), axis=1)[:, :nprobe]
+        for i, probe in enumerate(probes):
+            candidates = np.concatenate([self.lists[j] for j in probe])
+            if allowed is not None:
+                candidates = candidates[candidates < len(allowed)]
+                candidates = candidates[allowed[candidates]]
+            row, distance = nearest_rows(self.encodings, candidates, face_encodings[i:i + 1])
+            rows[i], distances[i] = row[0], distance[0]
+        return rows, distances
+
+    def __len__(self):
+        return len(self.encodings)
+
+
+def nearest_rows(encodings, candidates, face_encodings):
+    """candidates 행들 중에서 얼굴별로 가장 가까운 행과 거리를 반환한다."""
+    face_encodings = np.asarray(face_encodings, dtype=np.float32).reshape(-1, encodings.shape[1])
+    rows = np.full(len(face_encodings), -1, dtype=np.int64)
+    distances = np.full(len(face_encodings), np.inf, dtype=np.float32)
+    if len(face_encodings) == 0 or len(candidates) == 0:
+        return rows, distances
+    table = face_distance_matrix(encodings[candidates], face_encodings)
+    best = np.argmin(table, axis=1)
+    rows[:] = candidates[best]
+    distances[:] = table[np.arange(len(face_encodings)), best]
+    return rows, distances
+
+
+def make_index(encodings, threshold=5000, **kwargs):
+    """갤러리 크기에 따라 인덱스를 고른다. threshold개 이상이면 IVFIndex, 아니면 BruteForceIndex"""
+    encodings = np.asarray(encodings, dtype=np.float32)
+    if len(encodings) >= threshold:
+        return IVFIndex(encodings, **kwargs)
+    return BruteForceIndex(encodings)
@@ -1,7 +1,13 @@
 from .face_info import Face
 from .FaceFilter import *
+from .face_gallery import FaceGallery
+from .face_store import migrate_known_faces
+from .ObjectDetect import ObjectDetect
+import os
 import cv2
 import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from .path_manager import PathManager
 from PySide6.QtGui import QImage
 from .filter_manager import FilterManager
@@ -11,6 +17,11 @@ class FaceManager:
     _instance = None
     face_list : list[Face] = []
     filter_manager = FilterManager()
+    face_gallery = FaceGallery(PathManager().load_known_faces_path())
+    # 이미지가 parallel_threshold장 이상일 때만 프로세스 풀에서 인코딩한다.
+    # (Windows에서는 프로세스마다 모듈을 다시 import하므로 적은 수의 이미지는 한 프로세스에서 하는 것이 빠르다)
+    parallel_threshold = 8
+    max_encode_workers = 4
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
@@ -19,6 +30,8 @@ class FaceManager:
     
     def __init__(self):
         self.path_manager = PathManager()
+        # 기존 known_faces.pickle을 인코딩 저장소로 한 번 옮긴다
+        migrate_known_faces(self.path_manager.known_faces, self.path_manager.load_known_faces_path())
 
     def save_person_face(self):
         """현재까지 변경된 사항들을 파일에 저장"""
@@ -50,6 +63,35 @@ class FaceManager:
         self.save_person_face()
 
 
+    def register_encoding(self, face_id: int, image: np.ndarray):
+        """
+        image의 얼굴 특징을 저장소에 등록하고 갤러리(검색 인덱스)에 바로 추가한다.
+
+        Returns:
+        - 저장소의 face_number. 얼굴을 찾지 못하면 None
+        """
+        face_features = extract_face_features(image, ObjectDetect().face_detect(image))
+        if face_features is None:
+            print("No faces found for :", face_id)
+            return None
+        face_number = register_person_encoding(str(face_id), face_features, self.path_manager.load_known_faces_path())
+        self.face_gallery.add_encodings([face_features], [face_id], [face_number])
+        return face_number
+
+    def unregister_encoding(self, face_id: int, encoding_name: str = None):
+        """
+        face_id의 인코딩을 저장소와 갤러리에서 제거한다. encoding_name("<이름>_<face_number>")을 주면 그 인코딩 하나만 제거한다.
+        """
+        if encoding_name is None:
+            delete_person(str(face_id), self.path_manager.load_known_faces_path())
+            self.face_gallery.remove_encodings(face_id)
+            return
+        face_number = encoding_name.rsplit("_", 1)[-1]
+        if not face_number.isdigit():
+            return
+        delete_face_code(f"{face_id}_{face_number}", self.path_manager.load_known_faces_path())
+        self.face_gallery.remove_encodings(face_id, int(face_number))
+
     def add_person_encoding_by_name(self, face_name: str, image: np.ndarray):
         """face_name과 image를 전달하면 face_name과 일치하는 객체에 배열을 추가"""
         # if qimage.format() != QImage.Format_ARGB32:
@@ -61,10 +103,10 @@ class FaceManager:
         
         for face in self.face_list:
             if face.face_name == face_name:
-                if  register_person(str(face.face_id), image, self.path_manager.load_known_faces_path()):
-                    max_face_number = find_max_face_number(face_name, face.encoding_list)
-                    max_face_number += 1
-                    face_code = face_name + "_" + str(max_face_number)
+                face_number = self.register_encoding(face.face_id, image)
+                if face_number is not None:
+                    # 저장소의 face_number를 그대로 사용해 인코딩 하나를 지울 때 찾을 수 있게 한다
+                    face_code = face_name + "_" + str(face_number)
                     face.encoding_list[face_code] = image
                     self.save_person_face()
                     return True
@@ -73,6 +115,85 @@ class FaceManager:
                 
         raise ValueError("face name error")   
     
+    def add_person_encodings_by_name(self, face_name: str, images: list, progress=None, is_canceled=None, chunk_size=32):
+        """
+        face_name과 일치하는 객체에 여러 image를 한 번에 등록합니다.
+        이미지가 많으면 얼굴 특징 추출은 프로세스 풀에서 병렬로 수행하고, 저장소와 face 정보는 chunk_size장마다 한 번씩만 저장합니다.
+
+        Args:
+        - face_name: 등록할 사람 이름
+        - images: 이미지 np.array 리스트
+        - progress: 이미지 하나를 처리할 때마다 호출되는 함수 progress(처리한 수, image, 등록 여부)
+        - is_canceled: True를 반환하면 등록을 중단하는 함수. 이미 추출한 특징은 저장된다.
+
+        Returns:
+        - (등록된 이미지 수, 얼굴을 찾지 못한 이미지 수)
+        """
+        face = None
+        for person in self.face_list:
+            if person.face_name == face_name:
+                face = person
+                break
+        if face is None:
+            raise ValueError("face name error")
+
+        pending = []  # 아직 저장하지 않은 (image, 얼굴 특징)
+        registered, failed = 0, 0
+
+        def flush():
+            face_numbers = register_person_encodings(str(face.face_id), [features for _, features in pending], self.path_manager.load_known_faces_path())
+            self.face_gallery.add_encodings([features for _, features in pending], [face.face_id] * len(pending), face_numbers)
+            for (image, _), face_number in zip(pending, face_numbers):
+                face.encoding_list[face_name + "_" + str(face_number)] = image
+            self.save_person_face()
+            pending.clear()
+
+        workers = 1
+        if len(images) >= self.parallel_threshold:
+            workers = min(self.max_encode_workers, max(1, (os.cpu_count() or 2) - 1))
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for count, (image, features) in enumerate(self.extract_features(images, executor, workers), start=1):
+                if features is None:
+                    failed += 1
+                else:
+                    pending.append((image, features))
+                    registered += 1
+                if len(pending) >= chunk_size:
+                    flush()
+                if progress is not None:
+                    progress(count, image, features is not None)
+                if is_canceled is not None and is_canceled():
+                    break
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+            if pending:
+                flush()
+        return registered, failed
+
+    def extract_features(self, images, executor=None, workers=1):
+        """
+        images의 얼굴 특징을 순서대로 반환하는 generator. (image, 얼굴 특징 혹은 None)
+
+        얼굴 위치는 실행 중 사용하는 YOLO 모델로 이 스레드에서 한 장씩 찾고, 인코딩만 executor에 요청한다.
+        요청은 workers의 두 배까지만 쌓아두므로 진행률은 실제로 끝난 이미지 수를 따라간다.
+        """
+        detector = ObjectDetect()
+        if executor is None:
+            for image in images:
+                yield image, extract_face_features(image, detector.face_detect(image))
+            return
+        futures = deque()
+        for image in images:
+            futures.append((image, executor.submit(extract_face_features, image, detector.face_detect(image))))
+            while futures and (len(futures) >= workers * 2 or futures[0][1].done()):
+                image, future = futures.popleft()
+                yield image, future.result()
+        while futures:
+            image, future = futures.popleft()
+            yield image, future.result()
+
     # def add_person_encoding_by_name_from_img(self, face_name: str, img):
     #     for face in self.face_list:
     #         print("face.face_name", face.face_name)
@@ -99,10 +220,9 @@ class FaceManager:
         
         for face in self.face_list:
             if face.face_id == face_id:
-                if  register_person(str(face.face_id), image, self.path_manager.load_known_faces_path()):
-                    max_face_number = find_max_face_number(face_id, face.encoding_list)
-                    max_face_number += 1
-                    face_code = face_id + "_" + str(max_face_number)
+                face_number = self.register_encoding(face.face_id, image)
+                if face_number is not None:
+                    face_code = face.face_name + "_" + str(face_number)
                     face.encoding_list[face_code] = image
                     self.save_person_face()
                     return True
@@ -117,6 +237,7 @@ class FaceManager:
                 self.face_list.remove(face)
                 for filter in self.filter_manager.filter_list:
                     self.filter_manager.delete_face_in_filter(filter.name, face.face_id)
+                self.unregister_encoding(face.face_id)
                 self.save_person_face()
                 return True
         raise ValueError("존재하지 않는 face_name입니다")
@@ -129,6 +250,7 @@ class FaceManager:
                 self.face_list.remove(face)
                 for filter in self.filter_manager.filter_list:
                     self.filter_manager.delete_face_in_filter(filter.name, face_id)
+                self.unregister_encoding(face_id)
                 self.save_person_face()
                 return True
         raise ValueError("존재하지 않는 face_id입니다")
@@ -140,6 +262,7 @@ class FaceManager:
             if face.face_name == person_name:
                 value = face.encoding_list.pop(encoding_name, 0)
                 if value != 0:
+                    self.unregister_encoding(face.face_id, encoding_name)
                     self.save_person_face()
                     return True
                 else:
@@ -154,6 +277,7 @@ class FaceManager:
             if face.face_id == face_id:
                 value = face.encoding_list.pop(encoding_name, 0)
                 if value != 0:
+                    self.unregister_encoding(face.face_id, encoding_name)
                     self.save_person_face()
                     return True
                 else:
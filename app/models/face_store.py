@@ -0,0 +1,197 @@
+import os
+import pickle
+import struct
+import numpy as np
+
+ENCODING_SIZE = 128
+HEADER_SIZE = 128  # .npy 헤더를 고정 크기로 써서 행을 덧붙일 때 헤더만 다시 쓸 수 있게 한다
+INDEX_COLUMNS = 3  # face_id, face_number, alive
+
+
+class FaceEncodingStore:
+    """
+    얼굴 인코딩을 디스크에 저장하는 저장소입니다.
+
+    <base_path>_encodings.npy 에 (N×128) float32 인코딩 행렬을,
+    <base_path>_index.npy 에 (N×3) int32 [face_id, face_number, alive] 배열을 저장합니다.
+    두 파일은 np.load(mmap_mode='r')로 읽을 수 있어 프로세스끼리 복사 없이 공유됩니다.
+
+    추가는 파일 끝에 행을 덧붙이고, 삭제는 alive를 0으로 바꾸기만 합니다.
+    삭제된 행의 비율이 compact_ratio를 넘으면 다음에 저장소를 읽을 때 살아있는 행만 남기도록 다시 씁니다.
+    (읽는 쪽이 파일을 mmap 하고 있는 동안에는 파일을 교체할 수 없기 때문)
+    """
+
+    def __init__(self, base_path, compact_ratio=0.25):
+        self.base_path = base_path
+        self.encodings_path = base_path + "_encodings.npy"
+        self.index_path = base_path + "_index.npy"
+        self.compact_ratio = compact_ratio
+
+    def exists(self):
+        return os.path.exists(self.encodings_path) and os.path.exists(self.index_path)
+
+    def create(self):
+        """빈 저장소 파일을 만든다."""
+        self.write(np.zeros((0, ENCODING_SIZE), dtype=np.float32), np.zeros((0, INDEX_COLUMNS), dtype=np.int32))
+
+    def load(self, mmap_mode='r'):
+        """
+        저장소를 읽어옵니다.
+
+        Returns:
+        - encodings: (N×128) float32 인코딩 행렬 (삭제된 행 포함)
+        - index: (N×3) int32 [face_id, face_number, alive] 배열
+        """
+        if not self.exists():
+            self.create()
+        encodings = load_array(self.encodings_path, mmap_mode, (0, ENCODING_SIZE), np.float32)
+        index = load_array(self.index_path, mmap_mode, (0, INDEX_COLUMNS), np.int32)
+        # 두 파일에 덧붙이는 도중 중단되었다면 짧은 쪽에 맞춘다
+        rows = min(len(encodings), len(index))
+        return encodings[:rows], index[:rows]
+
+    def load_alive(self):
+        """
+        삭제되지 않은 행만 읽어옵니다.
+
+        Returns:
+        - encodings: 살아있는 행의 인코딩 행렬. 삭제된 행이 없으면 mmap 그대로 반환한다.
+        - face_ids: 행별 face_id 배열
+        - face_numbers: 행별 face_number 배열
+        """
+        encodings, index = self.load()
+        alive = index[:, 2] == 1
+        if not alive.all():
+            rows = np.flatnonzero(alive)
+            encodings, index = encodings[rows], index[rows]
+        return encodings, np.asarray(index[:, 0]), np.asarray(index[:, 1])
+
+    def to_dict(self):
+        """살아있는 행을 {"<face_id>_<n>": encoding} 딕셔너리로 반환한다."""
+        encodings, face_ids, face_numbers = self.load_alive()
+        return {f"{face_id}_{face_number}": np.array(encoding)
+                for encoding, face_id, face_number in zip(encodings, face_ids, face_numbers)}
+
+    def max_face_number(self, face_id):
+        """face_id의 가장 큰 face_number를 반환한다. 없으면 -1"""
+        _, index = self.load()
+        numbers = index[index[:, 0] == int(face_id), 1]
+        if len(numbers) == 0:
+            return -1
+        return int(numbers.max())
+
+    def append(self, face_id, encodings):
+        """
+        face_id의 인코딩들을 파일 끝에 덧붙입니다.
+
+        Returns:
+        - 추가된 face_number 리스트
+        """
+        encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+        start = self.max_face_number(face_id) + 1
+        face_numbers = list(range(start, start + len(encodings)))
+        index = np.array([[int(face_id), face_number, 1] for face_number in face_numbers], dtype=np.int32).reshape(-1, INDEX_COLUMNS)
+        append_array(self.encodings_path, encodings)
+        append_array(self.index_path, index)
+        return face_numbers
+
+    def delete(self, face_id, face_number=None):
+        """
+        face_id의 인코딩을 삭제합니다. face_number를 주면 그 인코딩 하나만 삭제합니다.
+
+        Returns:
+        - 삭제된 행의 수
+        """
+        index = np.load(self.index_path, mmap_mode='r+') if self.exists() else None
+        if index is None or len(index) == 0:
+            return 0
+        target = (index[:, 0] == int(face_id)) & (index[:, 2] == 1)
+        if face_number is not None:
+            target &= index[:, 1] == int(face_number)
+        deleted = int(target.sum())
+        if deleted:
+            index[target, 2] = 0
+            index.flush()
+        del index
+        return deleted
+
+    def dead_ratio(self):
+        """삭제된 행의 비율"""
+        _, index = self.load()
+        if len(index) == 0:
+            return 0.0
+        return float((index[:, 2] == 0).mean())
+
+    def compact_if_needed(self):
+        """삭제된 행의 비율이 compact_ratio를 넘으면 compact 한다."""
+        if self.exists() and self.dead_ratio() > self.compact_ratio:
+            self.compact()
+
+    def compact(self):
+        """삭제된 행을 제거하여 파일을 다시 쓴다. 파일을 mmap 하고 있는 곳이 없을 때 호출해야 한다."""
+        encodings, index = self.load(mmap_mode=None)
+        alive = index[:, 2] == 1
+        self.write(encodings[alive], index[alive])
+
+    def write(self, encodings, index):
+        """인코딩 행렬과 index 배열로 두 파일을 새로 쓴다."""
+        for path, array in ((self.encodings_path, encodings), (self.index_path, index)):
+            temp_path = path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                write_header(f, array.shape, array.dtype)
+                f.write(np.ascontiguousarray(array).tobytes())
+            os.replace(temp_path, path)
+
+
+def write_header(f, shape, dtype):
+    """HEADER_SIZE 바이트 고정 크기의 .npy(1.0) 헤더를 쓴다."""
+    header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (np.dtype(dtype).str, tuple(int(n) for n in shape))
+    header = header.ljust(HEADER_SIZE - 10 - 1) + "\n"
+    f.seek(0)
+    f.write(b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1"))
+
+
+def append_array(path, rows):
+    """고정 크기 헤더의 .npy 파일 끝에 행을 덧붙이고 헤더의 shape를 갱신한다."""
+    with open(path, 'r+b') as f:
+        f.seek(8)
+        header_size = struct.unpack("<H", f.read(2))[0]
+        header = f.read(header_size).decode("latin1")
+        count = int(header.split("'shape': (")[1].split(",")[0])
+        f.seek(0, os.SEEK_END)
+        f.write(np.ascontiguousarray(rows).tobytes())
+        write_header(f, (count + len(rows),) + rows.shape[1:], rows.dtype)
+
+
+def load_array(path, mmap_mode, empty_shape, dtype):
+    """np.load로 배열을 읽는다. 행이 없는 파일은 mmap 할 수 없으므로 빈 배열을 반환한다."""
+    try:
+        return np.load(path, mmap_mode=mmap_mode)
+    except ValueError:
+        return np.zeros(empty_shape, dtype=dtype)
+
+
+def migrate_known_faces(pickle_path, store_path):
+    """
+    기존 known_faces.pickle({"<face_id>_<n>": encoding})을 저장소로 한 번 옮깁니다.
+    저장소가 이미 있으면 아무것도 하지 않습니다.
+
+    Returns:
+    - 옮겨졌는지 여부
+    """
+    store = FaceEncodingStore(store_path)
+    if store.exists() or not os.path.exists(pickle_path):
+        return False
+    with open(pickle_path, 'rb') as f:
+        known_faces = pickle.load(f)
+
+    encodings = []
+    index = []
+    for face_code, encoding in known_faces.items():
+        face_id, face_number = face_code.rsplit("_", 1)
+        encodings.append(np.asarray(encoding, dtype=np.float32))
+        index.append([int(face_id), int(face_number), 1])
+    store.write(np.asarray(encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE),
+                np.asarray(index, dtype=np.int32).reshape(-1, INDEX_COLUMNS))
+    print("migrated known faces :", len(index))
+    return True
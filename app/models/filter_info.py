@@ -15,6 +15,16 @@ class Filter:
     imgsz_mag: float = 33
     predict_conf: float = 10
 
+    # 얼굴 인코딩 전 품질 검사 기준. 기준에 못 미치는 얼굴은 인식하지 않고 블러 처리한다
+    face_min_size: int = 20  # 얼굴 박스 짧은 변의 최소 크기 (px)
+    face_min_sharpness: float = 20  # 최소 선명도 (Laplacian 분산)
+    face_min_conf: float = 25  # 최소 YOLO 신뢰도 (%, predict_conf와 같은 단위)
+    face_min_aspect: float = 0.45  # 최소 가로/세로 비율 (옆모습 등 극단적인 각도를 거른다)
+
+    # 작은 얼굴 탐지를 위한 타일 탐지. tile_size가 0이면 사용하지 않는다
+    tile_size: int = 0  # 타일 한 변의 크기 (px). 이미지가 이보다 크면 겹치는 타일로 나누어 함께 탐지한다
+    tile_overlap: float = 0.2  # 이웃한 타일이 겹치는 비율
+
     def __post_init__(self):
         if not isinstance(self.face_filter, dict):
             self.face_filter = {filter_name: -1 for filter_name in self.face_filter}
@@ -100,6 +100,20 @@ class FilterManager:
                 return filter_obj.blur_shape
         raise ValueError("존재하지 않는 filtername입니다.")   
      
+    def get_face_quality_in_filter(self, filter_name: str):
+        """필터 프리셋의 얼굴 품질 검사 기준을 (최소 크기, 최소 선명도, 최소 신뢰도, 최소 가로/세로 비율)로 반환한다."""
+        for filter_obj in self.filter_list:
+            if filter_obj.name == filter_name:
+                return filter_obj.face_min_size, filter_obj.face_min_sharpness, filter_obj.face_min_conf, filter_obj.face_min_aspect
+        raise ValueError("존재하지 않는 filtername입니다.")
+
+    def get_tiling_in_filter(self, filter_name: str):
+        """필터 프리셋의 타일 탐지 설정을 (타일 크기, 겹침 비율)로 반환한다."""
+        for filter_obj in self.filter_list:
+            if filter_obj.name == filter_name:
+                return filter_obj.tile_size, filter_obj.tile_overlap
+        raise ValueError("존재하지 않는 filtername입니다.")
+
     def get_filters(self):
         """전체 필터 리스트를 가져옵니다."""
         return self.filter_list[:]
@@ -204,6 +218,33 @@ class FilterManager:
         #print("filterName:", filter_name)
         raise ValueError("존재하지 않는 filtername입니다.")
 
+    def update_face_quality_in_filter(self, filter_name: str, min_size: int = None, min_sharpness: float = None, min_conf: float = None, min_aspect: float = None):
+        """필터 프리셋의 얼굴 품질 검사 기준을 변경한다. None인 값은 바꾸지 않는다."""
+        for filter_obj in self.filter_list:
+            if filter_obj.name == filter_name:
+                if min_size is not None:
+                    filter_obj.face_min_size = min_size
+                if min_sharpness is not None:
+                    filter_obj.face_min_sharpness = min_sharpness
+                if min_conf is not None:
+                    filter_obj.face_min_conf = min_conf
+                if min_aspect is not None:
+                    filter_obj.face_min_aspect = min_aspect
+                self.save_filters()
+                return
+        raise ValueError("존재하지 않는 filtername입니다.")
+
+    def update_tiling_in_filter(self, filter_name: str, tile_size: int, tile_overlap: float = None):
+        """필터 프리셋의 타일 탐지 설정을 변경한다. tile_size가 0이면 타일 탐지를 사용하지 않는다."""
+        for filter_obj in self.filter_list:
+            if filter_obj.name == filter_name:
+                filter_obj.tile_size = tile_size
+                if tile_overlap is not None:
+                    filter_obj.tile_overlap = tile_overlap
+                self.save_filters()
+                return
+        raise ValueError("존재하지 않는 filtername입니다.")
+
     def remove_filter(self, filter_name: str):
         """지정된 이름의 필터를 제거합니다."""
         for idx, filter_obj in enumerate(self.filter_list):
@@ -0,0 +1,52 @@
+import copy
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from .filter_info import Filter
+
+ORIGIN_CLASSES = {"Human face": 264}  # 일반 모델로 탐지하는 객체 이름과 class 번호
+
+
+@dataclass(frozen=True)
+class FilterPlan:
+    """
+    Filter를 프레임 처리에 바로 쓸 수 있게 미리 계산해 둔 실행 계획입니다. 만든 뒤에는 바뀌지 않습니다.
+
+    스트림 스레드는 프레임을 시작할 때만 계획을 교체하므로, 한 프레임은 항상 하나의 계획으로 처리됩니다.
+    """
+    filter: Filter  # 필터 정보의 복사본 (효과 설정)
+    origin_classes: Tuple[int, ...]  # 일반 모델로 탐지할 class 번호
+    custom_names: Tuple[str, ...]  # 사용자 정의 모델로 탐지할 객체 이름 (없으면 사용자 정의 모델을 실행하지 않는다)
+    object_names: frozenset  # 블러할 객체 이름
+    face_ids: Tuple[int, ...]  # 인식할 얼굴 id
+    conf: float  # YOLO 신뢰도 (0~1)
+    mag_ratio: float  # 탐지 배율
+    tile_size: int
+    tile_overlap: float
+    face_gallery: Optional[object] = None  # face_ids만 검색하는 FaceGallerySubset
+
+    @classmethod
+    def compile(cls, current_filter: Filter, face_gallery=None):
+        """
+        current_filter로 실행 계획을 만든다. face_gallery(FaceGallery)를 주면 필터의 얼굴만 검색하는 갤러리를 함께 만든다.
+        원본 필터는 바꾸지 않는다.
+        """
+        current_filter = copy.deepcopy(current_filter)
+        object_names = set(current_filter.object_filter)
+        object_names.add("Human face")  # 얼굴은 항상 탐지한다
+        face_ids = tuple(current_filter.face_filter.keys())
+        if face_gallery is not None:
+            face_gallery = face_gallery.subset(face_ids)
+            face_gallery.prepare_index()  # 검색 인덱스는 스트림 스레드가 아닌 계획을 만드는 스레드에서 만든다
+        return cls(
+            filter=current_filter,
+            origin_classes=tuple(ORIGIN_CLASSES[name] for name in sorted(object_names) if name in ORIGIN_CLASSES),
+            custom_names=tuple(sorted(name for name in object_names if name not in ORIGIN_CLASSES)),
+            object_names=frozenset(object_names),
+            face_ids=face_ids,
+            conf=current_filter.predict_conf / 100,
+            mag_ratio=current_filter.imgsz_mag * 3 / 100 + 0.01,  # 0.01은 배율이 0이 되지 않도록
+            tile_size=current_filter.tile_size,
+            tile_overlap=current_filter.tile_overlap,
+            face_gallery=face_gallery,
+        )
+
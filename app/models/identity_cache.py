@@ -0,0 +1,89 @@
+class IdentityCache:
+    """
+    DeepSort track_id 별로 인식된 얼굴 정보를 저장하는 캐시입니다.
+
+    한 번 인식된 track은 다음 경우에만 다시 인식(재검증)합니다.
+        - 마지막 인식 후 verify_interval 프레임이 지났을 때
+        - 박스 넓이가 area_change 비율 이상 변했을 때
+        - 인식 거리가 허용 거리(tolerance)에 min_margin 이내로 가까웠을 때 (신뢰도 낮음)
+
+    tracker가 얼굴 인코딩을 외형 embedding으로 쓰는 경우, track별 마지막 인코딩도 저장하여 인식을 건너뛴 프레임에 재사용합니다.
+    """
+
+    def __init__(self, verify_interval=30, area_change=0.5, tolerance=0.3, min_margin=0.05):
+        self.verify_interval = verify_interval
+        self.area_change = area_change
+        self.tolerance = tolerance
+        self.min_margin = min_margin
+        self.entries = dict()  # {track_id: {"face_id", "distance", "area", "frame"}}
+        self.embeddings = dict()  # {track_id: 마지막 얼굴 인코딩}
+        self.frame_count = 0
+        self.generation = 0  # clear 될 때마다 증가
+
+    def next_frame(self):
+        """프레임 카운터를 증가시킨다."""
+        self.frame_count += 1
+
+    def get(self, track_id):
+        """track_id에 저장된 정보를 반환한다. 없으면 None"""
+        return self.entries.get(track_id)
+
+    def needs_verify(self, track_id, box):
+        """track_id의 얼굴을 다시 인식해야 하는지 반환한다. box는 x1, y1, x2, y2의 형식"""
+        if track_id is None:
+            return True
+        entry = self.entries.get(track_id)
+        if entry is None:
+            return True
+        if self.frame_count - entry["frame"] >= self.verify_interval:
+            return True
+        area = box_area(box)
+        if entry["area"] > 0 and abs(area - entry["area"]) / entry["area"] >= self.area_change:
+            return True
+        if entry["distance"] is not None and self.tolerance - entry["distance"] < self.min_margin:
+            return True
+        return False
+
+    def update(self, track_id, face_id, distance, box):
+        """track_id의 인식 결과를 저장한다."""
+        if track_id is None:
+            return
+        self.entries[track_id] = {
+            "face_id": face_id,
+            "distance": distance,
+            "area": box_area(box),
+            "frame": self.frame_count,
+        }
+
+    def get_embedding(self, track_id):
+        """track_id의 마지막 얼굴 인코딩을 반환한다. 없으면 None"""
+        return self.embeddings.get(track_id)
+
+    def set_embedding(self, track_id, embedding):
+        """track_id의 얼굴 인코딩을 저장한다."""
+        if track_id is None or embedding is None:
+            return
+        self.embeddings[track_id] = embedding
+
+    def evict(self, alive_track_ids):
+        """살아있지 않은 track의 정보를 제거한다."""
+        alive_track_ids = set(alive_track_ids)
+        for track_id in list(self.entries.keys()):
+            if track_id not in alive_track_ids:
+                del self.entries[track_id]
+        for track_id in list(self.embeddings.keys()):
+            if track_id not in alive_track_ids:
+                del self.embeddings[track_id]
+
+    def clear(self):
+        """저장된 인식 결과를 모두 제거한다. 얼굴 인코딩은 갤러리와 관계없으므로 유지한다."""
+        self.entries = dict()
+        self.generation += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def box_area(box):
+    """x1, y1, x2, y2 형식 박스의 넓이"""
+    return max(0, box[2] - box[0]) * max(0, box[3] - box[1])
@@ -0,0 +1,64 @@
+class KeyframeScheduler:
+    """
+    영상에서 YOLO 탐지를 수행할 프레임(keyframe)을 정하는 클래스입니다.
+
+    interval 프레임마다 한 번만 탐지하고, 그 사이 프레임은 tracker(칼만 필터)가 예측한 박스를 사용합니다.
+    keyframe에서 새로 나타나거나 사라진 객체가 있으면 interval을 줄이고,
+    변화 없는 keyframe이 grow_after번 이어지면 interval을 늘립니다.
+
+    예측 박스는 keyframe에서 멀어질수록 부정확해지므로, 지난 프레임 수만큼 margin_step 비율씩 박스를 키웁니다.
+    """
+
+    def __init__(self, interval=3, min_interval=1, max_interval=6, grow_after=5, margin_step=0.05, max_margin=0.3):
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.grow_after = grow_after
+        self.margin_step = margin_step
+        self.max_margin = max_margin
+        self.since_keyframe = 0  # 마지막 keyframe 이후 지난 프레임 수
+        self.stable_count = 0  # 변화 없이 이어진 keyframe 수
+        self.force = True  # 다음 프레임을 반드시 keyframe으로 처리
+
+    def next_frame(self):
+        """
+        다음 프레임으로 넘어간다.
+
+        Returns:
+        - 이 프레임이 keyframe이면 True
+        """
+        if self.force or self.since_keyframe + 1 >= self.interval:
+            self.force = False
+            self.since_keyframe = 0
+            return True
+        self.since_keyframe += 1
+        return False
+
+    def update(self, changed):
+        """keyframe의 탐지 결과가 예측과 달랐는지(changed) 반영하여 interval을 조정한다."""
+        if changed:
+            self.stable_count = 0
+            self.interval = max(self.min_interval, self.interval // 2)
+            return
+        self.stable_count += 1
+        if self.stable_count >= self.grow_after:
+            self.stable_count = 0
+            self.interval = min(self.max_interval, self.interval + 1)
+
+    def margin(self):
+        """현재 프레임의 예측 박스를 키울 비율"""
+        return min(self.max_margin, self.since_keyframe * self.margin_step)
+
+    def reset(self):
+        """다음 프레임부터 다시 탐지하도록 한다. (필터 변경, track 초기화 시)"""
+        self.force = True
+        self.since_keyframe = 0
+        self.stable_count = 0
+
+
+def grow_box(box, margin, width, height):
+    """x1, y1, x2, y2 박스를 가로/세로 margin 비율만큼 키우고 이미지 안으로 자른다."""
+    x1, y1, x2, y2 = box
+    dx = (x2 - x1) * margin / 2
+    dy = (y2 - y1) * margin / 2
+    return [max(0, int(x1 - dx)), max(0, int(y1 - dy)), min(width, int(x2 + dx)), min(height, int(y2 + dy))]
@@ -0,0 +1,73 @@
+import os
+import shutil
+from ultralytics import YOLO
+
+BACKENDS = ("pytorch", "onnx", "openvino")
+PRECISIONS = {
+    "pytorch": ("fp32",),
+    "onnx": ("fp32", "int8"),  # int8은 onnxruntime 동적 양자화
+    "openvino": ("fp32", "fp16", "int8"),  # int8은 ultralytics(NNCF) 학습 후 양자화
+}
+
+
+def artifact_path(weights, backend, precision="fp32"):
+    """
+    weights(.pt)를 backend 형식으로 내보낸 파일의 경로를 반환합니다. 가중치 파일 옆에 저장됩니다.
+    예) models/bad.pt -> models/bad.onnx, models/bad_int8.onnx, models/bad_fp16_openvino_model/
+    """
+    root, _ = os.path.splitext(weights)
+    suffix = "" if precision == "fp32" else "_" + precision
+    if backend == "onnx":
+        return root + suffix + ".onnx"
+    if backend == "openvino":
+        return root + suffix + "_openvino_model"
+    return weights
+
+
+def export_model(weights, backend, precision="fp32"):
+    """
+    weights를 backend 형식으로 내보냅니다. 이미 내보낸 파일이 있으면 다시 내보내지 않습니다.
+
+    Returns:
+    - 내보낸 파일(폴더)의 경로
+    """
+    path = artifact_path(weights, backend, precision)
+    if os.path.exists(path):
+        return path
+
+    if backend == "onnx" and precision == "int8":
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(export_model(weights, "onnx"), path, weight_type=QuantType.QUInt8)
+        return path
+
+    # 내보내기 결과는 가중치 파일 이름을 따르므로, 정밀도별 이름의 복사본에서 내보낸다
+    source = weights
+    if precision != "fp32":
+        source = os.path.splitext(path.replace("_openvino_model", ""))[0] + ".pt"
+        shutil.copyfile(weights, source)
+    try:
+        exported = YOLO(source).export(format=backend, dynamic=True, half=precision == "fp16", int8=precision == "int8")
+    finally:
+        if source != weights:
+            os.remove(source)
+    if os.path.normpath(str(exported)) != os.path.normpath(path):
+        shutil.move(str(exported), path)
+    return path
+
+
+def load_model(weights, backend="pytorch", precision="fp32"):
+    """
+    backend 형식의 YOLO 모델을 불러옵니다. 처음 한 번만 내보내고 이후에는 저장된 파일을 사용합니다.
+    내보내기에 실패하거나 지원하지 않는 조합이면 PyTorch 모델을 불러옵니다.
+    결과는 모두 같은 YOLO 객체이므로 predict 결과 형식은 같습니다.
+    """
+    if backend not in BACKENDS or backend == "pytorch":
+        return YOLO(weights)
+    if precision not in PRECISIONS[backend]:
+        print(f"{backend} does not support {precision}, use fp32")
+        precision = "fp32"
+    try:
+        return YOLO(export_model(weights, backend, precision), task="detect")
+    except Exception as e:
+        print(f"{backend} export failed, use pytorch :", e)
+        return YOLO(weights)
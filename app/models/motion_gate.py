@@ -0,0 +1,86 @@
+import time
+import cv2
+import numpy as np
+from .box_ops import merge_boxes
+
+
+class MotionGate:
+    """
+    이전 탐지 프레임과 비교하여 바뀐 영역을 찾는 클래스입니다.
+
+    프레임을 width 폭으로 줄인 흑백 이미지끼리 차이를 구해,
+        - 바뀐 곳이 없으면 "static" (이전 탐지 결과를 그대로 사용)
+        - 일부만 바뀌었으면 "regions" 와 바뀐 영역 박스 리스트 (그 영역만 탐지)
+        - 많이 바뀌었거나 refresh_interval초가 지났으면 "full" (전체 탐지)
+    를 반환합니다. 기준 프레임은 실제로 탐지를 수행한 프레임(accept 호출)으로만 갱신되므로
+    조금씩 바뀌는 변화도 누적되어 잡힙니다.
+    """
+
+    def __init__(self, width=160, threshold=16, min_area=4, max_changed=0.4, refresh_interval=1.0, pad=0.05):
+        self.width = width
+        self.threshold = threshold  # 바뀐 픽셀로 볼 밝기 차이
+        self.min_area = min_area  # 줄인 이미지에서 바뀐 영역으로 볼 최소 픽셀 수
+        self.max_changed = max_changed  # 바뀐 영역 넓이가 이 비율을 넘으면 전체 탐지
+        self.refresh_interval = refresh_interval
+        self.pad = pad  # 바뀐 영역을 이미지 크기 대비 이 비율만큼 키운다
+        self.reference = None
+        self.last_full = 0
+        self.candidate = None  # 마지막으로 check한 프레임 (accept하면 기준 프레임이 된다)
+        self.candidate_full = False
+
+    def check(self, img):
+        """
+        img가 기준 프레임에서 얼마나 바뀌었는지 확인합니다.
+
+        Returns:
+        - ("static" | "regions" | "full", 바뀐 영역의 x1, y1, x2, y2 박스 리스트)
+        """
+        small = self.preprocess(img)
+        self.candidate = small
+        self.candidate_full = True
+        if self.reference is None or small.shape != self.reference.shape or time.time() - self.last_full >= self.refresh_interval:
+            return "full", []
+
+        mask = (cv2.absdiff(small, self.reference) > self.threshold).astype(np.uint8)
+        if mask.mean() > self.max_changed:
+            return "full", []
+        mask = cv2.dilate(mask, np.ones((3, 3), np.uint8), iterations=2)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+        rects = [stats[i] for i in range(1, count) if stats[i][cv2.CC_STAT_AREA] >= self.min_area]
+        if len(rects) == 0:
+            return "static", []
+
+        height, width = img.shape[:2]
+        scale = width / small.shape[1]
+        pad_x, pad_y = int(width * self.pad), int(height * self.pad)
+        regions = []
+        for x, y, w, h, _ in rects:
+            regions.append([max(0, int(x * scale) - pad_x), max(0, int(y * scale) - pad_y),
+                            min(width, int((x + w) * scale) + pad_x), min(height, int((y + h) * scale) + pad_y)])
+        regions = merge_boxes(regions)
+        if sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in regions) > width * height * self.max_changed:
+            return "full", []
+        self.candidate_full = False
+        return "regions", regions
+
+    def preprocess(self, img):
+        """폭을 width로 줄인 흑백 이미지"""
+        height, width = img.shape[:2]
+        size = (self.width, max(1, int(height * self.width / width)))
+        small = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (3, 3), 0)
+
+    def accept(self):
+        """마지막으로 check한 프레임을 탐지했으므로 기준 프레임으로 삼는다."""
+        if self.candidate is None:
+            return
+        self.reference = self.candidate
+        if self.candidate_full:
+            self.last_full = time.time()
+
+    def reset(self):
+        """다음 프레임은 전체 탐지하도록 한다."""
+        self.reference = None
+        self.candidate = None
@@ -16,6 +16,7 @@ class PathManager:
         self.setting_file = os.path.join(self.base_path, "setting_data.bin")
         self.filter_file = os.path.join(self.base_path, "filter_data.bin")
         self.known_faces = os.path.join(self.base_path, "known_faces.pickle")
+        self.known_faces_store = os.path.join(self.base_path, "known_faces")
         self.sticker_images = os.path.join(self.base_path, "sticker_images.bin")
         self.tempdata_dir = os.path.join(self.base_path, "TempData/")
 
@@ -119,5 +120,5 @@ class PathManager:
             return None
 
     def load_known_faces_path(self):
-        """known_faces.pickle 경로"""
-        return self.known_faces
+        """얼굴 인코딩 저장소 경로 (known_faces_encodings.npy, known_faces_index.npy)"""
+        return self.known_faces_store
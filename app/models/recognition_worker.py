@@ -0,0 +1,81 @@
+import queue
+import threading
+from .FaceFilter import tile_face_crops, face_recognition
+
+
+class RecognitionWorker:
+    """
+    백그라운드 스레드에서 얼굴 인식(인코딩 + 갤러리 비교)을 수행하는 클래스입니다.
+
+    스트림 스레드는 submit으로 얼굴 crop과 track_id를 넘기고 바로 다음 프레임으로 넘어가며,
+    인식이 끝난 결과는 collect로 가져갑니다. 처리 중인 작업이 max_jobs개를 넘으면 새 작업은 버려지고
+    다음 프레임에 다시 요청됩니다.
+    """
+
+    def __init__(self, face_size=150, max_jobs=2):
+        self.face_size = face_size
+        self.jobs = queue.Queue(maxsize=max_jobs)
+        self.resolved = queue.Queue()
+        self.pending = set()  # 인식 중인 track_id (스트림 스레드에서만 사용)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, img, track_ids, boxes, face_gallery, generation):
+        """
+        얼굴 crop을 잘라 인식 작업을 요청한다.
+
+        Args:
+        - img: 이미지 프레임
+        - track_ids: 인식할 얼굴의 track_id 리스트
+        - boxes: 인식할 얼굴의 x1, y1, x2, y2 박스 리스트
+        - face_gallery: 비교할 FaceGallery
+        - generation: 요청 시점의 캐시 세대. 세대가 바뀐 뒤 도착한 결과는 버려진다.
+
+        Returns:
+        - 작업이 요청되었는지 여부
+        """
+        pairs = [(track_id, box) for track_id, box in zip(track_ids, boxes) if track_id is not None and track_id not in self.pending]
+        if len(pairs) == 0:
+            return False
+        track_ids = [track_id for track_id, _ in pairs]
+        boxes = [box for _, box in pairs]
+        # crop은 새 배열이므로 이후 프레임에 블러가 적용되어도 영향이 없다
+        canvas, locations = tile_face_crops(img, boxes, self.face_size)
+        try:
+            self.jobs.put_nowait((canvas, locations, track_ids, boxes, face_gallery, generation))
+        except queue.Full:
+            return False
+        self.pending.update(track_ids)
+        return True
+
+    def collect(self, generation):
+        """
+        인식이 끝난 결과를 가져온다.
+
+        Returns:
+        - (track_id, face_id, 거리, 박스, 얼굴 인코딩)의 리스트. 현재 세대의 결과만 반환한다. 인코딩에 실패하면 인코딩은 None
+        """
+        results = []
+        while True:
+            try:
+                job_generation, track_ids, boxes, matches, face_encodes = self.resolved.get_nowait()
+            except queue.Empty:
+                break
+            self.pending.difference_update(track_ids)
+            if job_generation != generation:
+                continue
+            for track_id, box, (face_id, distance), face_encode in zip(track_ids, boxes, matches, face_encodes):
+                results.append((track_id, face_id, distance, box, face_encode))
+        return results
+
+    def run(self):
+        while True:
+            canvas, locations, track_ids, boxes, face_gallery, generation = self.jobs.get()
+            try:
+                face_encodes = face_recognition.face_encodings(canvas, locations)
+                matches = face_gallery.match(face_encodes)
+            except Exception as e:
+                print("recognition error :", e)
+                face_encodes = [None] * len(track_ids)
+                matches = [(None, None)] * len(track_ids)
+            self.resolved.put((generation, track_ids, boxes, matches, face_encodes))
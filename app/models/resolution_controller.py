@@ -0,0 +1,93 @@
+class ResolutionController:
+    """
+    프레임 처리 시간에 맞춰 YOLO 입력 크기(imgsz)를 조절하는 클래스입니다.
+
+    프레임 처리 시간의 이동 평균이 목표 시간(1 / target_fps)의 upper 배를 patience 프레임 연속 넘으면 imgsz를 step만큼 줄이고,
+    lower 배보다 patience 프레임 연속 짧으면 step만큼 늘립니다. (upper와 lower 사이에서는 유지)
+    imgsz는 필터에서 설정한 크기(imgsz_mag)를 넘지 않으며, 부하가 큰 컴퓨터에서는 프레임 대신 탐지 해상도가 줄어듭니다.
+    """
+
+    def __init__(self, target_fps=30, min_imgsz=224, step=32, upper=1.0, lower=0.7, patience=15, smoothing=0.1):
+        self.target_fps = target_fps
+        self.min_imgsz = min_imgsz
+        self.step = step
+        self.upper = upper
+        self.lower = lower
+        self.patience = patience
+        self.smoothing = smoothing
+        self.frame_time = None  # 프레임 처리 시간의 이동 평균 (초)
+        self.over_count = 0
+        self.under_count = 0
+        self.imgsz = None  # 현재 imgsz (긴 변, 32의 배수). None이면 필터 설정 그대로
+        self.max_imgsz = None
+        self.floor_imgsz = min_imgsz  # 줄일 수 있는 최소 imgsz (필터 설정이 min_imgsz보다 작으면 필터 설정)
+
+    def update(self, frame_time):
+        """
+        프레임 처리 시간(초)을 반영한다.
+
+        Returns:
+        - imgsz가 바뀌었으면 True
+        """
+        if self.frame_time is None:
+            self.frame_time = frame_time
+        else:
+            self.frame_time += (frame_time - self.frame_time) * self.smoothing
+        if self.imgsz is None:
+            return False
+
+        budget = 1 / self.target_fps
+        if self.frame_time > budget * self.upper:
+            self.over_count += 1
+            self.under_count = 0
+        elif self.frame_time < budget * self.lower:
+            self.under_count += 1
+            self.over_count = 0
+        else:
+            self.over_count = 0
+            self.under_count = 0
+
+        if self.over_count >= self.patience and self.imgsz > self.floor_imgsz:
+            self.set_imgsz(self.imgsz - self.step)
+            return True
+        if self.under_count >= self.patience and self.imgsz < self.max_imgsz:
+            self.set_imgsz(self.imgsz + self.step)
+            return True
+        return False
+
+    def set_imgsz(self, imgsz):
+        self.imgsz = max(self.floor_imgsz, min(self.max_imgsz, imgsz))
+        self.over_count = 0
+        self.under_count = 0
+        self.frame_time = None  # 바뀐 크기의 처리 시간을 새로 측정한다
+
+    def ratio(self, img_shape, mag_ratio):
+        """
+        필터 설정의 배율(mag_ratio)을 상한으로 하여, 현재 imgsz에 해당하는 배율을 반환한다.
+
+        Args:
+        - img_shape: 이미지의 shape
+        - mag_ratio: 필터 설정에서 계산된 배율 (ObjectDetect.detect의 mag_ratio)
+        """
+        long_side = max(img_shape[0], img_shape[1])
+        max_imgsz = max(32, round_up(long_side * mag_ratio, 32))
+        if self.max_imgsz != max_imgsz:
+            # 필터 설정이나 화면 크기가 바뀌면 새 상한에서 다시 시작
+            self.max_imgsz = max_imgsz
+            self.floor_imgsz = min(self.min_imgsz, max_imgsz)
+            self.set_imgsz(max_imgsz)
+        return self.imgsz / long_side
+
+    def reset(self):
+        """측정을 처음부터 다시 한다."""
+        self.frame_time = None
+        self.over_count = 0
+        self.under_count = 0
+        self.imgsz = None
+        self.max_imgsz = None
+        self.floor_imgsz = self.min_imgsz
+
+
+def round_up(value, multiple):
+    """value를 multiple의 배수로 올린다."""
+    return int(-(-value // multiple) * multiple)
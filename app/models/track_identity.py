@@ -0,0 +1,61 @@
+from .detections import NO_ID
+
+
+class TrackIdentityTable:
+    """
+    track_id별로 연결된 얼굴 id(스티커를 붙일 얼굴)를 저장하는 표입니다.
+
+    한 얼굴 id에 여러 track이 연결될 수 있습니다. (track이 끊겼다가 새 id로 이어지거나, 같은 얼굴이 두 번 탐지된 경우)
+    판정이 없는 프레임(품질 미달로 인식을 건너뛰었거나 비동기 인식을 기다리는 중)에는 연결을 max_misses번까지 유지합니다. (hysteresis)
+    인식이 다른 얼굴이나 필터에 없는 얼굴(NO_ID)로 판정하면 연결을 바로 바꾸거나 제거합니다.
+    연결이 남아있으면 블러가 풀릴 수 있으므로, 판정이 어긋나면 기다리지 않고 블러 쪽으로 되돌립니다.
+    """
+
+    def __init__(self, max_misses=2):
+        self.max_misses = max_misses
+        self.entries = dict()  # {track_id: {"face_id", "misses"}}
+
+    def get(self, track_id):
+        """track_id에 연결된 얼굴 id를 반환한다. 없으면 NO_ID"""
+        entry = self.entries.get(track_id)
+        return entry["face_id"] if entry is not None else NO_ID
+
+    def observe(self, track_id, face_id):
+        """
+        이번 프레임에 track_id와 짝지어진 탐지의 인식 판정을 반영한다.
+        face_id: 인식된 얼굴 id, 필터에 없는 얼굴이면 NO_ID, 판정이 없으면 None
+        """
+        entry = self.entries.get(track_id)
+        if face_id is None:
+            if entry is not None:
+                entry["misses"] += 1
+                if entry["misses"] > self.max_misses:
+                    del self.entries[track_id]
+            return
+        if face_id == NO_ID:
+            self.entries.pop(track_id, None)
+            return
+        if entry is not None and entry["face_id"] == face_id:
+            entry["misses"] = 0
+            return
+        self.entries[track_id] = {"face_id": face_id, "misses": 0}
+
+    def retain(self, face_ids):
+        """face_ids에 없는 얼굴과의 연결을 제거한다. (필터에서 빠진 얼굴)"""
+        face_ids = set(face_ids)
+        for track_id in list(self.entries.keys()):
+            if self.entries[track_id]["face_id"] not in face_ids:
+                del self.entries[track_id]
+
+    def evict(self, alive_track_ids):
+        """살아있지 않은 track의 연결을 제거한다."""
+        alive_track_ids = set(alive_track_ids)
+        for track_id in list(self.entries.keys()):
+            if track_id not in alive_track_ids:
+                del self.entries[track_id]
+
+    def clear(self):
+        self.entries = dict()
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,261 @@
+import numpy as np
+from deep_sort_realtime.deepsort_tracker import DeepSort
+from deep_sort_realtime.deep_sort.nn_matching import NearestNeighborDistanceMetric
+from .box_ops import box_iou, greedy_match
+
+# tracker 인터페이스
+#   update_tracks(raw_detections, frame=None, embeds=None): 탐지 결과([[x, y, w, h], 신뢰도, 객체 이름] 리스트)로 track을 갱신하고 track 리스트를 반환
+#   predict(): 탐지 없이 모든 track을 한 프레임 진행
+#   tracks: 현재 track 리스트
+#   needs_embeds: True이면 update_tracks에 탐지별 외형 embedding(얼굴 인코딩)을 넘겨야 한다. embedding이 없는 탐지는 None
+# track은 track_id, time_since_update, is_confirmed(), is_tentative(), is_deleted(), to_ltrb(orig), to_ltwh(orig)를 가진다. (DeepSort의 Track과 같음)
+TRACKERS = ("deepsort", "deepsort-cnn", "iou")
+
+
+def make_tracker(name, max_age):
+    """name("deepsort", "deepsort-cnn", "iou")에 해당하는 tracker를 만든다."""
+    if name == "iou":
+        return IoUTracker(max_age=max_age)
+    if name == "deepsort-cnn":
+        return DeepSortTracker(max_age=max_age, face_embeds=False)
+    if name != "deepsort":
+        print(f"unknown tracker {name}, use deepsort")
+    return DeepSortTracker(max_age=max_age)
+
+
+class DeepSortTracker:
+    """
+    DeepSort를 tracker 인터페이스에 맞춘 클래스입니다.
+
+    face_embeds가 True이면 DeepSort의 외형 모델(CNN)을 만들지 않고, 얼굴 인식에서 구한 128차원 얼굴 인코딩을 embedding으로 받습니다.
+    (한 얼굴을 프레임마다 CNN과 dlib으로 두 번 계산하지 않도록) False이면 DeepSort의 외형 모델이 탐지 박스마다 embedding을 계산합니다.
+    embedding이 None인 탐지(아직 인코딩하지 않은 얼굴)는 외형 비교 없이 칼만 필터 위치로만 짝지어집니다. (FaceEmbeddingMetric)
+    """
+
+    def __init__(self, max_age=30, face_embeds=True):
+        self.needs_embeds = face_embeds
+        # 얼굴 인코딩은 같은 사람끼리 cosine 거리가 대부분 0.2 미만이다 (유클리드 거리 0.6 기준)
+        self.deepsort = DeepSort(max_age=max_age, embedder=None if face_embeds else "mobilenet", max_cosine_distance=0.2)
+        if face_embeds:
+            self.deepsort.tracker.metric = FaceEmbeddingMetric(0.2)
+
+    @property
+    def tracks(self):
+        return self.deepsort.tracker.tracks
+
+    def update_tracks(self, raw_detections, frame=None, embeds=None):
+        if embeds is not None:
+            # DeepSort는 크기가 0인 박스를 버리므로 embedding도 같이 버린다
+            pairs = [(detection, embed) for detection, embed in zip(raw_detections, embeds) if detection[0][2] > 0 and detection[0][3] > 0]
+            raw_detections = [detection for detection, _ in pairs]
+            embeds = [MISSING_EMBED if embed is None else embed for _, embed in pairs]
+        return self.deepsort.update_tracks(raw_detections, embeds=embeds, frame=frame)
+
+    def predict(self):
+        self.deepsort.tracker.predict()
+
+
+EMBED_SIZE = 128  # 얼굴 인코딩 크기
+MISSING_EMBED = np.full(EMBED_SIZE, np.nan, dtype=np.float32)  # embedding이 없는 탐지
+
+
+class FaceEmbeddingMetric(NearestNeighborDistanceMetric):
+    """
+    embedding이 없는(NaN) 탐지와 track을 허용하는 DeepSort cosine 거리입니다.
+
+    embedding이 없는 탐지나 저장된 embedding이 없는 track 사이의 거리는 neutral(기본 matching_threshold의 절반)로 두어,
+    DeepSort가 칼만 필터 gating(위치)만으로 짝짓게 합니다. embedding이 없는 탐지는 track의 embedding 목록에 저장하지 않습니다.
+    """
+
+    def __init__(self, matching_threshold, budget=None, neutral=None):
+        super().__init__("cosine", matching_threshold, budget)
+        self.neutral = matching_threshold / 2 if neutral is None else neutral
+
+    def partial_fit(self, features, targets, active_targets):
+        features = np.asarray(features, dtype=np.float32).reshape(len(targets), EMBED_SIZE)
+        known = np.isfinite(features).all(axis=1)
+        for feature, target in zip(features[known], np.asarray(targets)[known]):
+            self.samples.setdefault(target, []).append(feature)
+            if self.budget is not None:
+                self.samples[target] = self.samples[target][-self.budget:]
+        self.samples = {k: self.samples[k] for k in active_targets if k in self.samples}
+
+    def distance(self, features, targets):
+        features = np.asarray(features, dtype=np.float32).reshape(-1, EMBED_SIZE)
+        cost_matrix = np.full((len(targets), len(features)), self.neutral)
+        known = np.flatnonzero(np.isfinite(features).all(axis=1))
+        if len(known) == 0:
+            return cost_matrix
+        for i, target in enumerate(targets):
+            samples = self.samples.get(target)
+            if samples:
+                cost_matrix[i, known] = self._metric(samples, features[known])
+        return cost_matrix
+
+
+class IoUTracker:
+    """
+    외형 정보 없이 박스 위치만으로 추적하는 SORT/ByteTrack 방식의 tracker입니다.
+
+    track마다 칼만 필터(등속 모델)로 다음 위치를 예측하고, 예측 박스와 탐지 박스를 IoU가 큰 쌍부터 짝짓습니다.
+    신뢰도가 high_score 이상인 탐지를 먼저 짝짓고, 남은 확정 track은 신뢰도가 낮은 탐지와 한 번 더 짝짓습니다. (ByteTrack)
+    짝이 없는 탐지는 신뢰도와 관계없이 새 track이 됩니다. (블러할 얼굴을 놓치지 않도록)
+    n_init 프레임 연속 짝지어진 track은 확정(confirmed)되고, max_age 프레임 넘게 짝이 없으면 삭제됩니다.
+    DeepSort와 달리 CNN을 실행하지 않으므로 CPU에서 빠르지만, 얼굴이 겹쳤다가 갈라질 때 id가 바뀔 수 있습니다.
+    """
+
+    needs_embeds = False
+
+    def __init__(self, max_age=30, n_init=3, iou_threshold=0.3, high_score=0.5):
+        self.max_age = max_age
+        self.n_init = n_init
+        self.iou_threshold = iou_threshold
+        self.high_score = high_score
+        self.tracks = []
+        self.next_id = 1
+
+    def update_tracks(self, raw_detections, frame=None, embeds=None):
+        """탐지 결과로 track을 갱신한다. frame, embeds는 사용하지 않는다. (DeepSortTracker와 같은 형식)"""
+        self.predict()
+        raw_detections = [detection for detection in raw_detections if detection[0][2] > 0 and detection[0][3] > 0]
+        ltwh = np.asarray([detection[0] for detection in raw_detections], dtype=np.float32).reshape(-1, 4)
+        scores = np.asarray([detection[1] for detection in raw_detections], dtype=np.float32)
+        boxes = ltwh.copy()
+        boxes[:, 2:] += boxes[:, :2]
+
+        high = np.flatnonzero(scores >= self.high_score)
+        low = np.flatnonzero(scores < self.high_score)
+        track_indexes = np.arange(len(self.tracks))
+        matches, unmatched_tracks, unmatched_high = self.match(track_indexes, high, boxes)
+        confirmed = [i for i in unmatched_tracks if self.tracks[i].is_confirmed()]
+        low_matches, _, unmatched_low = self.match(np.asarray(confirmed, dtype=np.int64), low, boxes)
+
+        matched = set()
+        for track_index, detection_index in matches + low_matches:
+            self.tracks[track_index].update(ltwh[detection_index], scores[detection_index], raw_detections[detection_index][2], self.n_init)
+            matched.add(track_index)
+        for i, track in enumerate(self.tracks):
+            if i not in matched:
+                track.mark_missed(self.max_age)
+        for detection_index in unmatched_high + unmatched_low:
+            self.tracks.append(IoUTrack(str(self.next_id), ltwh[detection_index], scores[detection_index], raw_detections[detection_index][2]))
+            self.next_id += 1
+        self.tracks = [track for track in self.tracks if not track.is_deleted()]
+        return self.tracks
+
+    def match(self, track_indexes, detection_indexes, boxes):
+        """
+        track_indexes의 track과 detection_indexes의 탐지를 IoU로 짝짓는다.
+
+        Returns:
+        - ([(track index, 탐지 index)], 짝이 없는 track index 리스트, 짝이 없는 탐지 index 리스트)
+        """
+        if len(track_indexes) == 0 or len(detection_indexes) == 0:
+            return [], list(track_indexes), list(detection_indexes)
+        predicted = np.asarray([self.tracks[i].to_ltrb() for i in track_indexes], dtype=np.float32)
+        pairs = greedy_match(box_iou(predicted, boxes[detection_indexes]), self.iou_threshold)
+        matches = [(int(track_indexes[t]), int(detection_indexes[d])) for t, d in pairs]
+        matched_tracks = {t for t, _ in pairs}
+        matched_detections = {d for _, d in pairs}
+        unmatched_tracks = [int(track_indexes[t]) for t in range(len(track_indexes)) if t not in matched_tracks]
+        unmatched_detections = [int(detection_indexes[d]) for d in range(len(detection_indexes)) if d not in matched_detections]
+        return matches, unmatched_tracks, unmatched_detections
+
+    def predict(self):
+        """탐지 없이 모든 track을 칼만 필터로 한 프레임 진행시킨다."""
+        for track in self.tracks:
+            track.predict()
+
+
+class IoUTrack:
+    """IoUTracker의 track. DeepSort의 Track과 같은 메서드를 가진다."""
+    TENTATIVE, CONFIRMED, DELETED = 1, 2, 3
+
+    def __init__(self, track_id, ltwh, score, det_class):
+        self.track_id = track_id
+        self.mean, self.covariance = kalman_initiate(ltwh_to_xywh(ltwh))
+        self.state = IoUTrack.TENTATIVE
+        self.hits = 1
+        self.age = 1
+        self.time_since_update = 0
+        self.original_ltwh = np.asarray(ltwh, dtype=np.float32)
+        self.det_conf = float(score)
+        self.det_class = det_class
+
+    def predict(self):
+        self.mean, self.covariance = kalman_predict(self.mean, self.covariance)
+        self.age += 1
+        self.time_since_update += 1
+        self.original_ltwh = None
+
+    def update(self, ltwh, score, det_class, n_init):
+        self.mean, self.covariance = kalman_update(self.mean, self.covariance, ltwh_to_xywh(ltwh))
+        self.hits += 1
+        self.time_since_update = 0
+        self.original_ltwh = np.asarray(ltwh, dtype=np.float32)
+        self.det_conf = float(score)
+        self.det_class = det_class
+        if self.state == IoUTrack.TENTATIVE and self.hits >= n_init:
+            self.state = IoUTrack.CONFIRMED
+
+    def mark_missed(self, max_age):
+        if self.state == IoUTrack.TENTATIVE or self.time_since_update > max_age:
+            self.state = IoUTrack.DELETED
+
+    def is_tentative(self):
+        return self.state == IoUTrack.TENTATIVE
+
+    def is_confirmed(self):
+        return self.state == IoUTrack.CONFIRMED
+
+    def is_deleted(self):
+        return self.state == IoUTrack.DELETED
+
+    def to_ltwh(self, orig=False):
+        """박스(x, y, w, h). orig가 True이면 이번 프레임에 짝지어진 탐지 박스 (없으면 예측 박스)"""
+        if orig and self.original_ltwh is not None:
+            return self.original_ltwh.copy()
+        cx, cy, w, h = self.mean[:4]
+        return np.asarray([cx - w / 2, cy - h / 2, w, h])
+
+    def to_ltrb(self, orig=False):
+        box = self.to_ltwh(orig)
+        box[2:] += box[:2]
+        return box
+
+
+# 칼만 필터. 상태는 (중심 x, 중심 y, 폭, 높이)와 각각의 속도. 잡음은 박스 크기에 비례한다 (DeepSort와 같은 방식)
+STD_POSITION = 1 / 20
+STD_VELOCITY = 1 / 160
+MOTION = np.eye(8) + np.eye(8, k=4)  # 한 프레임 동안 위치 += 속도
+MEASURE = np.eye(4, 8)
+
+
+def ltwh_to_xywh(ltwh):
+    left, top, width, height = ltwh
+    return np.asarray([left + width / 2, top + height / 2, width, height], dtype=np.float64)
+
+
+def kalman_initiate(measurement):
+    """측정값(중심 x, 중심 y, 폭, 높이)으로 상태와 공분산을 만든다. 속도는 0에서 시작한다."""
+    mean = np.concatenate([measurement, np.zeros(4)])
+    size = np.asarray([measurement[2], measurement[3], measurement[2], measurement[3]])
+    std = np.concatenate([2 * STD_POSITION * size, 10 * STD_VELOCITY * size])
+    return mean, np.diag(np.square(std))
+
+
+def kalman_predict(mean, covariance):
+    size = np.asarray([mean[2], mean[3], mean[2], mean[3]])
+    noise = np.diag(np.square(np.concatenate([STD_POSITION * size, STD_VELOCITY * size])))
+    mean = MOTION @ mean
+    covariance = MOTION @ covariance @ MOTION.T + noise
+    return mean, covariance
+
+
+def kalman_update(mean, covariance, measurement):
+    size = np.asarray([mean[2], mean[3], mean[2], mean[3]])
+    projected_cov = MEASURE @ covariance @ MEASURE.T + np.diag(np.square(STD_POSITION * size))
+    gain = np.linalg.solve(projected_cov, MEASURE @ covariance).T
+    mean = mean + gain @ (measurement - MEASURE @ mean)
+    covariance = covariance - gain @ projected_cov @ gain.T
+    return mean, covariance
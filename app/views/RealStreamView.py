@@ -155,6 +155,18 @@ class RealStreamView(QWidget):
         button_layout.addWidget(self.webcam_button)
         button_layout.addWidget(self.screen_button)
         button_layout.addWidget(self.screen_focus_button)
+        button_layout.addStretch()
+
+        # 처리 시간에 맞춰 조절되는 탐지 해상도
+        self.detect_size_label = QLabel("detect : ")
+        self.detect_size_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.streaming_processor.detect_size.connect(self.set_detect_size)
+        button_layout.addWidget(self.detect_size_label)
+        # 1초 동안 인코딩한 얼굴 수 / 탐지된 얼굴 수 (나머지는 캐시 재사용, 품질 미달로 인코딩을 건너뜀)
+        self.encode_stats_label = QLabel("encode : ")
+        self.encode_stats_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.streaming_processor.encode_stats.connect(self.set_encode_stats)
+        button_layout.addWidget(self.encode_stats_label)
         button_layout_frame.setLayout(button_layout)
         
         # 웹캠 선택시 내용 출력
@@ -473,6 +485,14 @@ class RealStreamView(QWidget):
         screen_size = "screen : " + str(size[0]) + "x" + str(size[1])
         self.screen_size_label.setText(screen_size)
     
+    def set_detect_size(self, imgsz : int):
+        """탐지 해상도 텍스트"""
+        self.detect_size_label.setText("detect : " + str(imgsz) + "px")
+
+    def set_encode_stats(self, stats : dict):
+        """인코딩 통계 텍스트"""
+        self.encode_stats_label.setText("encode : " + str(stats["encoded"]) + "/" + str(stats["faces"]) + " faces")
+
     def detect_webcams(self):
         """연결된 카메라 장치를 검색합니다"""
         
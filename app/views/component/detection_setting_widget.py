@@ -58,6 +58,108 @@ class DetectSettingWidget(QWidget):
         default_mosaic_layout.addLayout(hlayout3, 1, 0, 2, 2)
         default_mosaic_layout.addWidget(self.intensity_slider3, 1, 3, 2, 6)
 
+        tile_size_label = QLabel("타일 크기")
+        self.tile_size_slider = QSlider(Qt.Horizontal)
+        self.tile_size_slider.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.tile_size_slider.setRange(0, 40)
+        self.tile_size_slider.valueChanged.connect(self.set_value_tile_size)
+
+        tile_size_help_icon = HelpIconWidget()
+        tile_size_help_icon.set_text("화면을 타일로 나누어 작은 얼굴을 찾습니다 (한 칸 = 32px)\n0이면 사용하지 않으며, 작을수록 작은 얼굴을 잘 잡지만 프레임이 떨어집니다")
+
+        tile_size_layout = QHBoxLayout()
+        tile_size_layout.addWidget(tile_size_label)
+        tile_size_layout.addWidget(tile_size_help_icon)
+        tile_size_layout.addStretch()
+
+        default_mosaic_layout.addLayout(tile_size_layout, 7, 0, 2, 2)
+        default_mosaic_layout.addWidget(self.tile_size_slider, 7, 3, 2, 6)
+
+        tile_overlap_label = QLabel("타일 겹침")
+        self.tile_overlap_slider = QSlider(Qt.Horizontal)
+        self.tile_overlap_slider.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.tile_overlap_slider.setRange(0, 50)
+        self.tile_overlap_slider.valueChanged.connect(self.set_value_tile_overlap)
+
+        tile_overlap_help_icon = HelpIconWidget()
+        tile_overlap_help_icon.set_text("이웃한 타일이 겹치는 비율(%)입니다\n높을수록 타일 경계에 걸친 얼굴을 놓치지 않지만 프레임이 떨어집니다")
+
+        tile_overlap_layout = QHBoxLayout()
+        tile_overlap_layout.addWidget(tile_overlap_label)
+        tile_overlap_layout.addWidget(tile_overlap_help_icon)
+        tile_overlap_layout.addStretch()
+
+        default_mosaic_layout.addLayout(tile_overlap_layout, 9, 0, 2, 2)
+        default_mosaic_layout.addWidget(self.tile_overlap_slider, 9, 3, 2, 6)
+
+        face_size_label = QLabel("얼굴 최소 크기")
+        self.face_size_slider = QSlider(Qt.Horizontal)
+        self.face_size_slider.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.face_size_slider.setRange(0, 100)
+        self.face_size_slider.valueChanged.connect(self.set_value_face_size)
+
+        face_size_help_icon = HelpIconWidget()
+        face_size_help_icon.set_text("이보다 작은 얼굴(px)은 인식을 건너뜁니다\n높을수록 멀리 있는 얼굴을 덜 인식하지만 오인식이 줄어듭니다")
+
+        face_size_layout = QHBoxLayout()
+        face_size_layout.addWidget(face_size_label)
+        face_size_layout.addWidget(face_size_help_icon)
+        face_size_layout.addStretch()
+
+        default_mosaic_layout.addLayout(face_size_layout, 11, 0, 2, 2)
+        default_mosaic_layout.addWidget(self.face_size_slider, 11, 3, 2, 6)
+
+        face_sharpness_label = QLabel("얼굴 선명도")
+        self.face_sharpness_slider = QSlider(Qt.Horizontal)
+        self.face_sharpness_slider.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.face_sharpness_slider.setRange(0, 200)
+        self.face_sharpness_slider.valueChanged.connect(self.set_value_face_sharpness)
+
+        face_sharpness_help_icon = HelpIconWidget()
+        face_sharpness_help_icon.set_text("이보다 흐린 얼굴은 인식을 건너뜁니다\n높을수록 흔들린 얼굴을 덜 인식하지만 오인식이 줄어듭니다")
+
+        face_sharpness_layout = QHBoxLayout()
+        face_sharpness_layout.addWidget(face_sharpness_label)
+        face_sharpness_layout.addWidget(face_sharpness_help_icon)
+        face_sharpness_layout.addStretch()
+
+        default_mosaic_layout.addLayout(face_sharpness_layout, 13, 0, 2, 2)
+        default_mosaic_layout.addWidget(self.face_sharpness_slider, 13, 3, 2, 6)
+
+        face_conf_label = QLabel("얼굴 신뢰도")
+        self.face_conf_slider = QSlider(Qt.Horizontal)
+        self.face_conf_slider.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.face_conf_slider.setRange(0, 100)
+        self.face_conf_slider.valueChanged.connect(self.set_value_face_conf)
+
+        face_conf_help_icon = HelpIconWidget()
+        face_conf_help_icon.set_text("얼굴 탐지 신뢰도(%)가 이보다 낮으면 인식을 건너뜁니다")
+
+        face_conf_layout = QHBoxLayout()
+        face_conf_layout.addWidget(face_conf_label)
+        face_conf_layout.addWidget(face_conf_help_icon)
+        face_conf_layout.addStretch()
+
+        default_mosaic_layout.addLayout(face_conf_layout, 15, 0, 2, 2)
+        default_mosaic_layout.addWidget(self.face_conf_slider, 15, 3, 2, 6)
+
+        face_aspect_label = QLabel("얼굴 각도")
+        self.face_aspect_slider = QSlider(Qt.Horizontal)
+        self.face_aspect_slider.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.face_aspect_slider.setRange(0, 100)
+        self.face_aspect_slider.valueChanged.connect(self.set_value_face_aspect)
+
+        face_aspect_help_icon = HelpIconWidget()
+        face_aspect_help_icon.set_text("얼굴의 가로/세로 비율(%)이 이보다 작으면 인식을 건너뜁니다\n높을수록 옆모습을 덜 인식합니다")
+
+        face_aspect_layout = QHBoxLayout()
+        face_aspect_layout.addWidget(face_aspect_label)
+        face_aspect_layout.addWidget(face_aspect_help_icon)
+        face_aspect_layout.addStretch()
+
+        default_mosaic_layout.addLayout(face_aspect_layout, 17, 0, 2, 2)
+        default_mosaic_layout.addWidget(self.face_aspect_slider, 17, 3, 2, 6)
+
         
         default_mosaic_layout.setColumnStretch(0, 2)
         default_mosaic_layout.setColumnStretch(1, 2)
@@ -79,6 +181,12 @@ class DetectSettingWidget(QWidget):
         if filter_data:
             self.intensity_slider2.setValue(filter_data.imgsz_mag)
             self.intensity_slider3.setValue(filter_data.predict_conf)
+            self.tile_size_slider.setValue(filter_data.tile_size // 32)
+            self.tile_overlap_slider.setValue(round(filter_data.tile_overlap * 100))
+            self.face_size_slider.setValue(filter_data.face_min_size)
+            self.face_sharpness_slider.setValue(round(filter_data.face_min_sharpness))
+            self.face_conf_slider.setValue(round(filter_data.face_min_conf))
+            self.face_aspect_slider.setValue(round(filter_data.face_min_aspect * 100))
 
     def set_value_slider2(self, value):
         """슬라이더 값 변경 시 호출되는 메서드"""
@@ -90,4 +198,32 @@ class DetectSettingWidget(QWidget):
         self.filter_controller.update_predict_conf_in_filter(self.filter_name, value)
         self.onEventUpdate.emit()
 
+    def set_value_tile_size(self, value):
+        """타일 크기 슬라이더 값 변경 시 호출되는 메서드 (한 칸 = 32px, 0이면 타일 탐지 끔)"""
+        self.filter_controller.update_tiling_in_filter(self.filter_name, value * 32)
+        self.onEventUpdate.emit()
+
+    def set_value_tile_overlap(self, value):
+        """타일 겹침 슬라이더 값 변경 시 호출되는 메서드 (% 단위)"""
+        self.filter_controller.update_tiling_in_filter(self.filter_name, self.tile_size_slider.value() * 32, value / 100)
+        self.onEventUpdate.emit()
+
+    def set_value_face_size(self, value):
+        """얼굴 최소 크기 슬라이더 값 변경 시 호출되는 메서드 (px)"""
+        self.filter_controller.update_face_quality_in_filter(self.filter_name, min_size=value)
+        self.onEventUpdate.emit()
 
+    def set_value_face_sharpness(self, value):
+        """얼굴 선명도 슬라이더 값 변경 시 호출되는 메서드"""
+        self.filter_controller.update_face_quality_in_filter(self.filter_name, min_sharpness=value)
+        self.onEventUpdate.emit()
+
+    def set_value_face_conf(self, value):
+        """얼굴 신뢰도 슬라이더 값 변경 시 호출되는 메서드 (%)"""
+        self.filter_controller.update_face_quality_in_filter(self.filter_name, min_conf=value)
+        self.onEventUpdate.emit()
+
+    def set_value_face_aspect(self, value):
+        """얼굴 각도 슬라이더 값 변경 시 호출되는 메서드 (가로/세로 비율 %)"""
+        self.filter_controller.update_face_quality_in_filter(self.filter_name, min_aspect=value / 100)
+        self.onEventUpdate.emit()
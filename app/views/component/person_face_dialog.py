@@ -112,6 +112,7 @@ class PersonFaceDialog(QDialog):
         self.face_registration_processor = FaceRegistrationProcessor()
         self.face_registration_processor.finished.connect(self.enroll_finished)
         self.face_registration_processor.addItem.connect(self.add_image)
+        self.face_registration_processor.countChanged.connect(self.update_progress)
 
         self.image_list_widget = QListWidget()
         self.image_list_widget.setStyleSheet(Style.list_widget_style)
@@ -170,7 +171,7 @@ class PersonFaceDialog(QDialog):
             self.progress_dialog.setWindowTitle("Progress")
             self.progress_dialog.setLabelText("얼굴을 등록 중 입니다")
             self.progress_dialog.setCancelButtonText("취소")
-            self.progress_dialog.setRange(0, 0)
+            self.progress_dialog.setRange(0, len(images))
             self.progress_dialog.canceled.connect(self.cancel_progress)
             
             self.face_registration_processor.setup(images, self.current_person)
@@ -186,6 +187,10 @@ class PersonFaceDialog(QDialog):
             msg.exec_()
             
         
+    def update_progress(self, count : int):
+        """등록 진행 상황 표시"""
+        self.progress_dialog.setValue(count)
+
     def enroll_finished(self, result : int):
         """이미지 등록 완료"""
         self.progress_dialog.close()
@@ -194,7 +199,7 @@ class PersonFaceDialog(QDialog):
             msg = QMessageBox()
             msg.setIcon(QMessageBox.Warning)
             msg.setWindowFlags(msg.windowFlags() | Qt.WindowStaysOnTopHint)
-            msg.setText("얼굴 등록에 실패했습니다 \n\n다음 사진은 등록할 수 없습니다\n1) 얼굴을 인식하기 어려운 사진 \n2) 두 명 이상 얼굴이 촬영된 사진")
+            msg.setText("일부 사진의 얼굴 등록에 실패했습니다 \n\n얼굴을 인식하기 어려운 사진은 등록할 수 없습니다\n(여러 명이 촬영된 사진은 가장 큰 얼굴이 등록됩니다)")
             msg.setWindowTitle("경고")
             msg.exec_()
         else:
@@ -0,0 +1,58 @@
+import os
+import sys
+
+# KeyframeScheduler가 interval 프레임마다 keyframe을 고르고, 탐지 결과의 변화에 따라 interval을 조정하는지 확인하는 테스트입니다.
+# 실행: python -m pytest "tests/Object Tracking/keyframe_scheduler_test.py" (저장소 최상위 폴더에서)
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "app"))
+from models.keyframe_scheduler import KeyframeScheduler, grow_box
+
+
+def test_keyframe_every_interval():
+    scheduler = KeyframeScheduler(interval=3)
+    assert [scheduler.next_frame() for _ in range(7)] == [True, False, False, True, False, False, True]
+
+
+def test_interval_shrinks_on_change_and_grows_when_stable():
+    scheduler = KeyframeScheduler(interval=4, min_interval=1, max_interval=5, grow_after=2)
+    scheduler.update(True)
+    assert scheduler.interval == 2
+    scheduler.update(True)
+    scheduler.update(True)
+    assert scheduler.interval == 1
+    for _ in range(2 * 10):
+        scheduler.update(False)
+    assert scheduler.interval == 5  # grow_after번마다 1씩 늘고 max_interval을 넘지 않는다
+    scheduler.update(False)
+    scheduler.update(True)
+    scheduler.update(False)
+    assert scheduler.interval == 2  # 변화가 있으면 안정 횟수도 처음부터 다시 센다
+
+
+def test_reset_forces_keyframe():
+    scheduler = KeyframeScheduler(interval=5)
+    scheduler.next_frame()
+    scheduler.next_frame()
+    assert scheduler.margin() > 0
+    scheduler.reset()
+    assert scheduler.margin() == 0
+    assert scheduler.next_frame()
+
+
+def test_margin_grows_with_distance_from_keyframe():
+    scheduler = KeyframeScheduler(interval=10, margin_step=0.1, max_margin=0.25)
+    scheduler.next_frame()
+    margins = []
+    for _ in range(4):
+        scheduler.next_frame()
+        margins.append(scheduler.margin())
+    assert margins == [0.1, 0.2, 0.25, 0.25]
+    assert grow_box([10, 10, 30, 50], 0.5, 35, 100) == [5, 0, 35, 60]  # 이미지 밖으로 나간 부분은 자른다
+
+
+if __name__ == "__main__":
+    test_keyframe_every_interval()
+    test_interval_shrinks_on_change_and_grows_when_stable()
+    test_reset_forces_keyframe()
+    test_margin_grows_with_distance_from_keyframe()
+    print("ok")
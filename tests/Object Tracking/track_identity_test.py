@@ -0,0 +1,63 @@
+import os
+import sys
+
+# TrackIdentityTable이 판정 없는 프레임은 max_misses번까지 연결을 유지하고(hysteresis),
+# 어긋난 판정에는 바로 연결을 바꾸거나 제거하는지 확인하는 테스트입니다.
+# 실행: python -m pytest "tests/Object Tracking/track_identity_test.py" (저장소 최상위 폴더에서)
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "app"))
+from models.track_identity import TrackIdentityTable
+from models.detections import NO_ID
+
+
+def test_hold_link_for_max_misses():
+    table = TrackIdentityTable(max_misses=2)
+    table.observe(1, 7)
+    table.observe(1, None)
+    table.observe(1, None)
+    assert table.get(1) == 7  # 판정이 없는 프레임 2번까지는 유지한다
+    table.observe(1, None)
+    assert table.get(1) == NO_ID
+
+
+def test_same_verdict_resets_misses():
+    table = TrackIdentityTable(max_misses=1)
+    table.observe(1, 7)
+    table.observe(1, None)
+    table.observe(1, 7)
+    table.observe(1, None)
+    assert table.get(1) == 7
+    table.observe(1, None)
+    assert table.get(1) == NO_ID
+
+
+def test_contrary_verdict_applies_at_once():
+    table = TrackIdentityTable(max_misses=2)
+    table.observe(1, 7)
+    table.observe(1, 8)
+    assert table.get(1) == 8  # 다른 얼굴로 판정되면 바로 바꾼다
+    table.observe(1, NO_ID)
+    assert table.get(1) == NO_ID  # 필터에 없는 얼굴로 판정되면 바로 제거한다 (블러)
+    table.observe(1, None)
+    assert table.get(1) == NO_ID and len(table) == 0  # 판정이 없다고 연결이 생기지는 않는다
+
+
+def test_retain_and_evict():
+    table = TrackIdentityTable()
+    table.observe(1, 7)
+    table.observe(2, 8)
+    table.observe(3, 7)
+    table.retain([7])
+    assert (table.get(1), table.get(2), table.get(3)) == (7, NO_ID, 7)
+    table.evict([3])
+    assert (table.get(1), table.get(3)) == (NO_ID, 7)
+    table.clear()
+    assert len(table) == 0
+
+
+if __name__ == "__main__":
+    test_hold_link_for_max_misses()
+    test_same_verdict_resets_misses()
+    test_contrary_verdict_applies_at_once()
+    test_retain_and_evict()
+    print("ok")
@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import numpy as np
+
+# DeepSort와 IoUTracker(칼만 필터 + IoU)의 id 바뀜(ID switch) 수와 프레임당 처리 시간을 비교하는 벤치마크입니다.
+# 얼굴 박스가 등속으로 움직이다 방향을 바꾸고, 서로 지나치며, 가끔 탐지되지 않는 합성 데이터를 사용합니다.
+# DeepSort(얼굴 인코딩 사용)에는 얼굴 인코딩 대신 사람마다 정해진 벡터에 잡음을 더한 embedding을 넘깁니다.
+# torch가 있으면 DeepSort의 외형 모델(mobilenet)을 쓰는 경우도 함께 비교합니다.
+# 실행: python "tests/Object Tracking/tracker_benchmark.py" (저장소 최상위 폴더에서)
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "app"))
+from models.trackers import DeepSortTracker, IoUTracker
+
+WIDTH, HEIGHT = 1920, 1080
+FRAMES = 300
+MISS_RATE = 0.1  # 탐지되지 않는 비율
+MAX_AGE = 6
+
+rng = np.random.default_rng(0)
+
+
+def make_scene(people):
+    """사람별 프레임마다의 박스(x, y, w, h)와 색을 만든다."""
+    size = rng.uniform(60, 160, people)
+    position = rng.uniform([0, 0], [WIDTH - 160, HEIGHT - 160], (people, 2))
+    velocity = rng.normal(0, 6, (people, 2))
+    frames = []
+    for _ in range(FRAMES):
+        turn = rng.random(people) < 0.02
+        velocity[turn] = rng.normal(0, 6, (turn.sum(), 2))
+        position += velocity
+        bounce = (position < 0) | (position > [WIDTH - 160, HEIGHT - 160])
+        velocity[bounce] *= -1
+        position = np.clip(position, 0, [WIDTH - 160, HEIGHT - 160])
+        frames.append(np.column_stack([position, size, size]).copy())
+    colors = rng.integers(0, 255, (people, 3))
+    return frames, colors
+
+
+def run(tracker, frames, colors, appearance=None):
+    """
+    tracker로 모든 프레임을 추적한다.
+
+    Returns:
+    - (ID switch 수, 프레임당 평균 시간 ms)
+    """
+    assigned = dict()  # 사람별 마지막으로 연결된 track_id
+    switches = 0
+    elapsed = 0
+    for boxes in frames:
+        visible = np.flatnonzero(rng.random(len(boxes)) >= MISS_RATE)
+        noisy = boxes[visible] + rng.normal(0, 2, (len(visible), 4))
+        detections = [[box.tolist(), 0.9, "Human face"] for box in noisy]
+        frame = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+        for (x, y, w, h), person in zip(noisy.astype(int), visible):
+            frame[max(0, y):y + h, max(0, x):x + w] = colors[person]
+        embeds = None
+        if appearance is not None:
+            embeds = [appearance[person] + rng.normal(0, 0.02, appearance.shape[1]) for person in visible]
+
+        start = time.perf_counter()
+        tracks = tracker.update_tracks(detections, frame=frame, embeds=embeds)
+        elapsed += time.perf_counter() - start
+
+        for track in tracks:
+            if not track.is_confirmed() or track.time_since_update > 0:
+                continue
+            box = track.to_ltwh(orig=True)
+            person = visible[np.argmin(np.abs(noisy - box).sum(axis=1))]
+            if person in assigned and assigned[person] != track.track_id:
+                switches += 1
+            assigned[person] = track.track_id
+    return switches, elapsed / len(frames) * 1000
+
+
+for people in [1, 5, 20]:
+    frames, colors = make_scene(people)
+    print(f"[{people} faces, {FRAMES} frames]")
+
+    appearance = rng.normal(size=(people, 128))
+    appearance /= np.linalg.norm(appearance, axis=1, keepdims=True)
+    switches, ms = run(DeepSortTracker(max_age=MAX_AGE), frames, colors, appearance)
+    print(f"    deepsort (face embeddings): {switches} id switches, {ms:.3f} ms/frame")
+
+    try:
+        deepsort = DeepSortTracker(max_age=MAX_AGE, face_embeds=False)
+    except Exception:
+        print("    deepsort (mobilenet embedder): skipped (torch is not installed)")
+    else:
+        switches, ms = run(deepsort, frames, colors)
+        print(f"    deepsort (mobilenet embedder): {switches} id switches, {ms:.3f} ms/frame")
+
+    switches, ms = run(IoUTracker(max_age=MAX_AGE), frames, colors)
+    print(f"    iou tracker: {switches} id switches, {ms:.3f} ms/frame")
@@ -0,0 +1,70 @@
+import os
+import sys
+import numpy as np
+
+# box_ops의 박스 연산(IoU, NMS, 중복 제거, 타일, 박스 합치기)이 올바른지 확인하는 테스트입니다.
+# 실행: python -m pytest "tests/ObjectDetection/box_ops_test.py" (저장소 최상위 폴더에서)
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "app"))
+from models.box_ops import box_iou, box_ioa, nms, not_duplicated, greedy_match, make_tiles, merge_boxes
+
+
+def test_iou_and_ioa():
+    a = [[0, 0, 10, 10]]
+    b = [[5, 0, 15, 10], [0, 0, 5, 5], [20, 20, 30, 30]]
+    assert np.allclose(box_iou(a, b), [[50 / 150, 25 / 100, 0]])
+    assert np.allclose(box_ioa(b, a)[:, 0], [0.5, 1, 0])  # b가 a에 포함되는 비율
+
+
+def test_nms_keeps_best_of_overlapping_boxes():
+    boxes = [[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60], [0, 0, 10, 9]]
+    scores = [0.6, 0.9, 0.5, 0.7]
+    keep = nms(boxes, scores, iou_threshold=0.5)
+    assert keep.tolist() == [1, 2]  # 점수 내림차순, 겹치는 박스는 점수가 높은 것만
+
+
+def test_nms_removes_contained_boxes_with_ioa():
+    boxes = [[0, 0, 100, 100], [0, 0, 30, 100]]  # 타일 경계에서 잘린 박스
+    scores = [0.9, 0.8]
+    assert nms(boxes, scores, iou_threshold=0.5).tolist() == [0, 1]
+    assert nms(boxes, scores, iou_threshold=0.5, ioa_threshold=0.7).tolist() == [0]
+
+
+def test_not_duplicated():
+    new_boxes = [[0, 0, 10, 10], [8, 0, 18, 10], [40, 40, 50, 50]]
+    boxes = [[0, 0, 12, 12]]
+    assert not_duplicated(new_boxes, boxes).tolist() == [False, True, True]
+    assert not_duplicated(new_boxes, []).tolist() == [True, True, True]
+
+
+def test_greedy_match():
+    scores = np.array([[0.9, 0.8], [0.85, 0.1], [0.2, 0.3]])
+    assert greedy_match(scores, 0.5) == [(0, 0)]  # (1, 0)은 열 0이 이미 짝지어졌고, 나머지는 threshold 미만
+    assert greedy_match(scores, 0.05) == [(0, 0), (2, 1)]
+    assert greedy_match(np.zeros((0, 3)), 0.5) == []
+
+
+def test_make_tiles_cover_image():
+    tiles = make_tiles(1000, 500, 400, overlap=0.25)
+    assert [tile[0] for tile in tiles[:3]] == [0, 300, 600]
+    assert all(x2 - x1 == 400 and y2 - y1 == 400 for x1, y1, x2, y2 in tiles)
+    assert max(tile[2] for tile in tiles) == 1000 and max(tile[3] for tile in tiles) == 500
+    assert make_tiles(300, 200, 400) == [[0, 0, 300, 200]]
+
+
+def test_merge_boxes():
+    boxes = [[0, 0, 10, 10], [5, 5, 20, 20], [18, 0, 30, 6], [50, 50, 60, 60]]
+    merged = merge_boxes(boxes)
+    assert sorted(merged) == [[0, 0, 30, 20], [50, 50, 60, 60]]  # 합친 박스가 다시 다른 박스와 겹치면 또 합친다
+    assert merge_boxes([[0, 0, 10, 10], [10, 0, 20, 10]]) == [[0, 0, 10, 10], [10, 0, 20, 10]]  # 맞닿기만 한 박스
+
+
+if __name__ == "__main__":
+    test_iou_and_ioa()
+    test_nms_keeps_best_of_overlapping_boxes()
+    test_nms_removes_contained_boxes_with_ioa()
+    test_not_duplicated()
+    test_greedy_match()
+    test_make_tiles_cover_image()
+    test_merge_boxes()
+    print("ok")
@@ -0,0 +1,83 @@
+import os
+import sys
+import numpy as np
+
+# Detections(열별 NumPy 배열로 저장한 탐지 결과)의 변환, 합치기, 선택이 올바른지 확인하는 테스트입니다.
+# 실행: python -m pytest "tests/ObjectDetection/detections_test.py" (저장소 최상위 폴더에서)
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "app"))
+from models.detections import Detections, NO_ID
+
+NAMES = {0: "Human face", 1: "Knife"}
+
+
+class FakeBoxes:
+    def __init__(self, data):
+        self.data = np.asarray(data, dtype=np.float32)
+
+
+class FakeResult:
+    """YOLO 예측 결과(Results) 대신 쓰는 객체. boxes.data는 (N×6) x1, y1, x2, y2, 신뢰도, class"""
+    def __init__(self, data):
+        self.boxes = FakeBoxes(data)
+
+
+def make_detections():
+    return Detections([[0, 0, 10, 20], [5, 5, 15, 15], [30, 30, 40, 50]], [0.9, 0.4, 0.7], [0, 1, 0], names=NAMES)
+
+
+def test_defaults():
+    detections = make_detections()
+    assert len(detections) == 3
+    assert detections.track_ids.tolist() == [NO_ID] * 3
+    assert detections.identity_ids.tolist() == [NO_ID] * 3
+    assert len(Detections()) == 0 and Detections().boxes.shape == (0, 4)
+
+
+def test_from_yolo_with_offset():
+    result = FakeResult([[1.7, 2.2, 11.9, 12.5, 0.8, 1]])
+    detections = Detections.from_yolo(result, NAMES, 100, 50)
+    assert detections.boxes.tolist() == [[101, 52, 111, 62]]  # 소수점은 버리고 offset만큼 옮긴다
+    assert detections.labels == ["Knife"]
+    assert len(Detections.from_yolo(FakeResult(np.zeros((0, 6))), NAMES)) == 0
+
+
+def test_concat_and_index():
+    detections = make_detections()
+    merged = Detections.concat([detections[[0]], None, detections[np.array([False, True, True])]])
+    assert merged.boxes.tolist() == detections.boxes.tolist()
+    assert merged.names is NAMES
+    picked = detections[2]
+    assert picked.boxes.tolist() == [[30, 30, 40, 50]] and picked.scores.tolist() == [np.float32(0.7)]
+    assert len(Detections.concat([], NAMES)) == 0
+
+
+def test_shifted_keeps_original():
+    detections = make_detections()
+    moved = detections.shifted(10, -5)
+    assert moved.boxes[0].tolist() == [10, -5, 20, 15]
+    assert detections.boxes[0].tolist() == [0, 0, 10, 20]
+
+
+def test_labels_and_threshold():
+    detections = make_detections()
+    assert detections.label_mask(["Human face"]).tolist() == [True, False, True]
+    kept = detections.threshold({"Human face": 0.8}, default=0.3)
+    assert kept.scores.tolist() == [np.float32(0.9), np.float32(0.4)]  # 얼굴은 0.8, 나머지는 0.3 이상만
+
+
+def test_to_list():
+    detections = make_detections()
+    assert detections.xywh[0].tolist() == [0, 0, 10, 20]
+    box, score, label = detections.to_list()[2]
+    assert box == [30, 30, 10, 20] and label == "Human face" and abs(score - 0.7) < 1e-6
+
+
+if __name__ == "__main__":
+    test_defaults()
+    test_from_yolo_with_offset()
+    test_concat_and_index()
+    test_shifted_keeps_original()
+    test_labels_and_threshold()
+    test_to_list()
+    print("ok")
@@ -0,0 +1,64 @@
+import os
+import sys
+import numpy as np
+
+# FaceGallery 검색이 등록/삭제 후에도 남아있는 사람을 찾는지 확인하는 테스트입니다.
+# 실제 dlib 인코딩 대신, 사람마다 중심 인코딩 주변에 등록 사진 인코딩이 모여있는 합성 데이터를 사용합니다.
+# 실행: python -m pytest tests/face_recognition/face_gallery_test.py (저장소 최상위 폴더에서)
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "app"))
+from models.face_gallery import FaceGallery
+
+PEOPLE = 5
+PHOTOS_PER_PERSON = 3
+
+
+def make_gallery():
+    """사람별 중심 인코딩과 등록 사진 인코딩으로 갤러리를 만든다. face_id는 1부터 PEOPLE까지"""
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(PEOPLE, 128)).astype(np.float32) * 0.06
+    labels = np.repeat(np.arange(PEOPLE), PHOTOS_PER_PERSON)
+    encodings = centers[labels] + rng.normal(size=(len(labels), 128)).astype(np.float32) * 0.015
+    gallery = FaceGallery()
+    gallery.set_encodings(encodings, labels + 1, np.tile(np.arange(PHOTOS_PER_PERSON), PEOPLE))
+    gallery.loaded = True
+    return gallery, encodings
+
+
+def test_match_after_removing_people():
+    gallery, encodings = make_gallery()
+    for face_id in [1, 2, 3]:
+        gallery.remove_encodings(face_id)
+    query = encodings[3 * PHOTOS_PER_PERSON]  # 4번 사람의 사진
+    face_id, distance = gallery.match([query])[0]
+    assert face_id == 4 and distance < 1e-5
+    assert gallery.match([encodings[0]])[0] == (None, None)  # 삭제된 사람은 찾지 않는다
+
+
+def test_subset_match_after_removing_people():
+    gallery, encodings = make_gallery()
+    subset = gallery.subset([1, 2, 3, 4])
+    for face_id in [1, 2, 3]:
+        gallery.remove_encodings(face_id)
+    face_id, _ = subset.match([encodings[3 * PHOTOS_PER_PERSON]])[0]
+    assert face_id == 4
+
+
+def test_subset_prepares_index_before_search():
+    gallery, encodings = make_gallery()
+    gallery.index_threshold = 2 * PHOTOS_PER_PERSON
+    subset = gallery.subset([1])
+    subset.prepare_index()
+    assert gallery.index is None  # 한 사람의 사진만으로는 인덱스가 필요 없다
+    subset = gallery.subset([1, 2])
+    subset.prepare_index()
+    assert gallery.index is not None
+    face_id, _ = subset.match([encodings[PHOTOS_PER_PERSON]])[0]
+    assert face_id == 2
+
+
+if __name__ == "__main__":
+    test_match_after_removing_people()
+    test_subset_match_after_removing_people()
+    test_subset_prepares_index_before_search()
+    print("ok")
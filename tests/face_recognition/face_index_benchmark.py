@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import numpy as np
+
+# 얼굴 갤러리 검색 인덱스(BruteForceIndex, IVFIndex)의 recall과 지연 시간을 비교하는 벤치마크입니다.
+# 실제 dlib 인코딩 대신, 사람마다 중심 인코딩 주변에 등록 사진 인코딩이 모여있는 합성 데이터를 사용합니다.
+# 실행: python tests/face_recognition/face_index_benchmark.py (저장소 최상위 폴더에서)
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "app"))
+from models.face_index import BruteForceIndex, IVFIndex
+from models.face_gallery import FaceGallery
+
+PHOTOS_PER_PERSON = 3
+FACES_PER_FRAME = 8
+REPEAT = 50
+
+rng = np.random.default_rng(0)
+
+
+def make_gallery(people):
+    """사람별 중심 인코딩과 등록 사진 인코딩을 만든다."""
+    centers = rng.normal(size=(people, 128)).astype(np.float32) * 0.06
+    labels = np.repeat(np.arange(people), PHOTOS_PER_PERSON)
+    encodings = centers[labels] + rng.normal(size=(len(labels), 128)).astype(np.float32) * 0.015
+    return centers, labels, encodings
+
+
+def measure(index, queries):
+    """한 프레임(FACES_PER_FRAME개의 얼굴) 검색에 걸리는 평균 시간(ms)과 결과"""
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        rows, _ = index.search(queries)
+    return (time.perf_counter() - start) / REPEAT * 1000, rows
+
+
+for people in [300, 3000, 30000]:
+    centers, labels, encodings = make_gallery(people)
+    targets = rng.choice(people, FACES_PER_FRAME, replace=False)
+    queries = centers[targets] + rng.normal(size=(FACES_PER_FRAME, 128)).astype(np.float32) * 0.015
+
+    exact_ms, exact_rows = measure(BruteForceIndex(encodings), queries)
+    print(f"[{len(encodings)} encodings] brute force: {exact_ms:.3f} ms/frame")
+
+    # 사람별 prototype으로 후보를 고른 뒤 후보의 사진만 비교하는 FaceGallery 검색
+    gallery = FaceGallery(index_threshold=len(encodings) + 1)
+    gallery.set_encodings(encodings, labels, np.zeros(len(labels)))
+    gallery.loaded = True
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        matches = gallery.match(queries)
+    gallery_ms = (time.perf_counter() - start) / REPEAT * 1000
+    recall = np.mean([face_id == labels[row] for (face_id, _), row in zip(matches, exact_rows)])
+    print(f"    prototype top-{gallery.top_k}: {gallery_ms:.3f} ms/frame, recall {recall:.2f}")
+
+    start = time.perf_counter()
+    ivf = IVFIndex(encodings)
+    train_ms = (time.perf_counter() - start) * 1000
+    for nprobe in [1, 4, 8, 16]:
+        ivf.nprobe = nprobe
+        ivf_ms, ivf_rows = measure(ivf, queries)
+        # 정확한 탐색과 같은 사람을 찾은 비율
+        recall = np.mean(labels[ivf_rows] == labels[exact_rows])
+        print(f"    ivf nlist={ivf.nlist} nprobe={nprobe}: {ivf_ms:.3f} ms/frame, recall {recall:.2f} (train {train_ms:.0f} ms)")
@@ -0,0 +1,67 @@
+import os
+import pickle
+import sys
+import numpy as np
+
+# FaceEncodingStore에 인코딩을 추가/삭제/compact 한 뒤 다시 읽었을 때 살아있는 행이 그대로 남는지 확인하는 테스트입니다.
+# 실행: python -m pytest tests/face_recognition/face_store_test.py (저장소 최상위 폴더에서)
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "app"))
+from models.face_store import FaceEncodingStore, ENCODING_SIZE, migrate_known_faces
+
+
+def encodings_of(value, count):
+    """모든 값이 value인 인코딩 count개"""
+    return np.full((count, ENCODING_SIZE), value, dtype=np.float32)
+
+
+def test_append_delete_compact_round_trip(tmp_path):
+    store = FaceEncodingStore(str(tmp_path / "known_faces"))
+    assert store.append(1, encodings_of(0.1, 3)) == [0, 1, 2]
+    assert store.append(2, encodings_of(0.2, 2)) == [0, 1]
+    assert store.append(1, encodings_of(0.3, 1)) == [3]  # face_number는 이어서 붙는다
+
+    assert store.delete(1, 1) == 1
+    assert store.delete(2) == 2
+    assert store.delete(2) == 0  # 이미 삭제된 행
+    encodings, face_ids, face_numbers = store.load_alive()
+    assert face_ids.tolist() == [1, 1, 1] and face_numbers.tolist() == [0, 2, 3]
+    assert np.allclose(encodings[:, 0], [0.1, 0.1, 0.3])
+    assert store.dead_ratio() == 0.5
+
+    store.compact_if_needed()
+    all_encodings, index = store.load()
+    assert len(all_encodings) == 3 and index[:, 2].tolist() == [1, 1, 1]
+    compacted, face_ids, face_numbers = store.load_alive()
+    assert face_ids.tolist() == [1, 1, 1] and face_numbers.tolist() == [0, 2, 3]
+    assert np.array_equal(compacted, encodings)
+
+    assert store.append(1, encodings_of(0.4, 1)) == [4]  # compact 한 뒤에도 덧붙일 수 있다
+    assert FaceEncodingStore(str(tmp_path / "known_faces")).to_dict().keys() == {"1_0", "1_2", "1_3", "1_4"}
+
+
+def test_compact_skipped_below_ratio(tmp_path):
+    store = FaceEncodingStore(str(tmp_path / "known_faces"), compact_ratio=0.5)
+    store.append(1, encodings_of(0.1, 4))
+    store.delete(1, 0)
+    store.compact_if_needed()
+    assert len(store.load()[0]) == 4  # 삭제된 행이 1/4뿐이므로 그대로 둔다
+
+
+def test_migrate_known_faces(tmp_path):
+    pickle_path = str(tmp_path / "known_faces.pickle")
+    with open(pickle_path, 'wb') as f:
+        pickle.dump({"3_0": encodings_of(0.5, 1)[0], "3_1": encodings_of(0.6, 1)[0]}, f)
+    store_path = str(tmp_path / "known_faces")
+    assert migrate_known_faces(pickle_path, store_path)
+    assert not migrate_known_faces(pickle_path, store_path)  # 저장소가 있으면 옮기지 않는다
+    assert FaceEncodingStore(store_path).max_face_number(3) == 1
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    for test in (test_append_delete_compact_round_trip, test_compact_skipped_below_ratio, test_migrate_known_faces):
+        with tempfile.TemporaryDirectory() as directory:
+            test(pathlib.Path(directory))
+    print("ok")